@@ -0,0 +1,113 @@
+"""
+Benchmarks course set representations for requirement algebra.
+
+Usage:
+    python benchmarks/bench_course_sets.py [--sizes 500 2000 8000] [--curriculums 3]
+
+Compares sets of Course model instances (what build_requirements used to
+union), frozensets of catalog ids, and int bitsets (utils.bitset) on the
+three operations planning leans on: the union of every curriculum's
+satisfiable subsets, intersecting that with the completed courses, and
+checking whether all of a course's prerequisites have been met.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.test')
+django.setup()
+
+from courseplanner.users.models import Course  # noqa: E402
+from courseplanner.utils.bitset import to_mask  # noqa: E402
+
+
+def synthetic_data(size, curriculums, requirements=40, max_prerequisites=3, seed=0):
+    rng = random.Random(seed)
+    prerequisites = [rng.sample(range(course), min(course, rng.randint(0, max_prerequisites)))
+                     for course in range(size)]
+    subsets = [[rng.sample(range(size), rng.randint(1, 4)) for _ in range(requirements)]
+               for _ in range(curriculums)]
+    completed = rng.sample(range(size), size // 4)
+    return prerequisites, subsets, completed
+
+
+def as_models(prerequisites, subsets, completed):
+    courses = [Course(pk=course + 1, code=f'CS {course}', credits=3) for course in range(len(prerequisites))]
+    return (
+        [[courses[other] for other in requisites] for requisites in prerequisites],
+        [[set(courses[course] for course in subset) for subset in curriculum] for curriculum in subsets],
+        set(courses[course] for course in completed),
+    )
+
+
+def as_ids(prerequisites, subsets, completed):
+    return (
+        [frozenset(requisites) for requisites in prerequisites],
+        [[frozenset(subset) for subset in curriculum] for curriculum in subsets],
+        frozenset(completed),
+    )
+
+
+def as_masks(prerequisites, subsets, completed):
+    return (
+        [to_mask(requisites) for requisites in prerequisites],
+        [[to_mask(subset) for subset in curriculum] for curriculum in subsets],
+        to_mask(completed),
+    )
+
+
+def run_sets(prerequisites, subsets, completed):
+    required = set()
+    for curriculum in subsets:
+        for subset in curriculum:
+            required |= subset
+    remaining = required - completed
+    met = sum(1 for requisites in prerequisites if all(requisite in completed for requisite in requisites))
+    return len(remaining), met
+
+
+def run_masks(prerequisites, subsets, completed):
+    required = 0
+    for curriculum in subsets:
+        for subset in curriculum:
+            required |= subset
+    missing = ~completed
+    remaining = required & missing
+    met = sum(1 for requisites in prerequisites if not requisites & missing)
+    return bin(remaining).count('1'), met
+
+
+def best_of(repeat, function, data):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*data)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 8000])
+    parser.add_argument('--curriculums', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'courses':>8} {'models ms':>10} {'ids ms':>10} {'bitset ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        data = synthetic_data(size, args.curriculums)
+        models, model_result = best_of(args.repeat, run_sets, as_models(*data))
+        ids, id_result = best_of(args.repeat, run_sets, as_ids(*data))
+        masks, mask_result = best_of(args.repeat, run_masks, as_masks(*data))
+        assert model_result == id_result == mask_result
+        print(f"{size:>8} {models * 1000:>10.3f} {ids * 1000:>10.3f} {masks * 1000:>10.3f} {models / masks:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmarks the ready-queue scheduler on synthetic catalogs.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--sizes 500 1000 2000 4000 8000] [--limit 16]
+
+Each catalog is a random layered DAG where every course has up to three
+prerequisites drawn from earlier layers, roughly the shape of a real
+university catalog.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import networkx as nx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from courseplanner.utils.scheduler import schedule  # noqa: E402
+
+
+def synthetic_graph(size, layers=8, max_prerequisites=3, seed=0):
+    rng = random.Random(seed)
+    graph = nx.DiGraph()
+    per_layer = max(1, size // layers)
+    for course in range(size):
+        graph.add_node(course, credits=rng.choice((1, 3, 3, 3, 4)))
+        layer = course // per_layer
+        if layer:
+            earlier = layer * per_layer
+            for prerequisite in rng.sample(range(earlier), min(earlier, rng.randint(0, max_prerequisites))):
+                graph.add_edge(prerequisite, course)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 4000, 8000])
+    parser.add_argument('--limit', type=int, default=16)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'courses':>8} {'edges':>8} {'semesters':>10} {'best ms':>10} {'us/course':>10}")
+    for size in args.sizes:
+        graph = synthetic_graph(size)
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            semesters = schedule(graph, args.limit)
+            best = min(best, time.perf_counter() - start)
+        print(f"{size:>8} {graph.number_of_edges():>8} {len(semesters):>10} "
+              f"{best * 1000:>10.2f} {best * 1e6 / size:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""
+Benchmarks and regression-checks the transcript parser on synthetic PDFs.
+
+Usage:
+    python benchmarks/bench_transcripts.py [--output results.json]
+        [--baseline benchmarks/baselines/transcripts.json [--speed] [--tolerance 0.3]]
+
+Each corpus case is a synthetic transcript (see
+courseplanner/users/tests/transcripts.py) with known courses. For every
+case this reports pages/sec and courses/sec (best of --repeat runs), the
+peak memory traced while parsing, and accuracy against the ground truth.
+Peak memory only covers this process, so it is left blank for cases
+extracted by worker processes.
+
+With --baseline, results are compared against a stored run. The script
+exits non-zero if accuracy drops at all, or if the peak memory of a case
+extracted serially in both runs grew by more than --tolerance. Timings
+depend on the machine, so throughput is only compared with --speed, and
+only against a baseline recorded on the same machine with the same
+parser version and worker count. Refresh the baseline with
+--output benchmarks/baselines/transcripts.json after an intended change.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.test')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+from courseplanner.users.tests.transcripts import synthetic_transcript  # noqa: E402
+from courseplanner.utils.utils import TRANSCRIPT_PARSER_VERSION, extract_course_info  # noqa: E402
+
+# name -> synthetic_transcript arguments
+CORPUS = {
+    'typical': dict(pages=3, terms=8, courses=40),
+    'long': dict(pages=40, terms=12, courses=60),
+    'dense': dict(pages=4, terms=8, courses=320),
+    'in-progress': dict(pages=2, terms=2, courses=12, grade_mix={None: 1}),
+    'failing': dict(pages=2, terms=4, courses=24, grade_mix={'F': 1, 'W': 1, 'WF': 1, 'I': 1}),
+}
+
+
+def accuracy(parsed, expected):
+    matched = sum((Counter(parsed) & Counter(expected)).values())
+    return {
+        'precision': matched / len(parsed) if parsed else 1.0,
+        'recall': matched / len(expected) if expected else 1.0,
+        'exact': parsed == expected,
+    }
+
+
+def run_case(arguments, repeat):
+    document, expected = synthetic_transcript(**arguments)
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parsed = extract_course_info(io.BytesIO(document))
+        best = min(best, time.perf_counter() - start)
+
+    serial = settings.TRANSCRIPT_WORKERS <= 1 or arguments['pages'] < settings.TRANSCRIPT_PARALLEL_MIN_PAGES
+    peak = None
+    if serial:
+        tracemalloc.start()
+        extract_course_info(io.BytesIO(document))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'pages_per_sec': arguments['pages'] / best,
+        'courses_per_sec': len(expected) / best,
+        'peak_kib': peak / 1024 if serial else None,
+        **accuracy(parsed, expected),
+    }
+
+
+def machine():
+    return f"{platform.node()} {platform.machine()} {os.cpu_count()} CPUs, Python {platform.python_version()}"
+
+
+def regressions(results, baseline, tolerance, speed):
+    problems = []
+    for name, case in results['cases'].items():
+        before = baseline['cases'].get(name)
+        if before is None:
+            continue
+        for metric in ('precision', 'recall'):
+            if case[metric] < before[metric]:
+                problems.append(f"{name}: {metric} fell from {before[metric]:.3f} to {case[metric]:.3f}")
+        if before['exact'] and not case['exact']:
+            problems.append(f"{name}: parse no longer matches the ground truth exactly")
+        if case['peak_kib'] is not None and before.get('peak_kib') is not None:
+            if case['peak_kib'] > before['peak_kib'] * (1 + tolerance):
+                problems.append(f"{name}: peak memory grew from {before['peak_kib']:.0f} "
+                                f"to {case['peak_kib']:.0f} KiB")
+        if speed:
+            for metric in ('pages_per_sec', 'courses_per_sec'):
+                if case[metric] < before[metric] * (1 - tolerance):
+                    problems.append(f"{name}: {metric} fell from {before[metric]:.1f} to {case[metric]:.1f}")
+    return problems
+
+
+# Reasons the baseline's timings can't be compared with this run's
+def speed_mismatches(results, baseline):
+    return [f"{field} is {results[field]!r} here but {baseline.get(field)!r} in the baseline"
+            for field in ('machine', 'parser_version', 'workers') if baseline.get(field) != results[field]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cases', nargs='+', choices=list(CORPUS), default=list(CORPUS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int,
+                        help="Override TRANSCRIPT_WORKERS; worker memory is not included in the peak.")
+    parser.add_argument('--output', type=Path, help="Write the results here as JSON.")
+    parser.add_argument('--baseline', type=Path, help="Fail on regressions against these stored results.")
+    parser.add_argument('--speed', action='store_true',
+                        help="Also fail on slowdowns; the baseline must come from this machine and configuration.")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="Allowed fractional slowdown or memory growth against the baseline.")
+    args = parser.parse_args()
+    if args.workers is not None:
+        settings.TRANSCRIPT_WORKERS = args.workers
+
+    results = {
+        'machine': machine(),
+        'parser_version': TRANSCRIPT_PARSER_VERSION,
+        'workers': settings.TRANSCRIPT_WORKERS,
+        'cases': {},
+    }
+    print(f"{'case':<12} {'pages/s':>9} {'courses/s':>10} {'peak KiB':>9} {'precision':>9} {'recall':>7} {'exact':>6}")
+    for name in args.cases:
+        case = results['cases'][name] = run_case(CORPUS[name], args.repeat)
+        peak = '-' if case['peak_kib'] is None else f"{case['peak_kib']:.0f}"
+        print(f"{name:<12} {case['pages_per_sec']:>9.1f} {case['courses_per_sec']:>10.1f} {peak:>9} "
+              f"{case['precision']:>9.3f} {case['recall']:>7.3f} {str(case['exact']):>6}")
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if args.speed:
+            mismatches = speed_mismatches(results, baseline)
+            if mismatches:
+                sys.exit("Can't compare speed: " + "; ".join(mismatches) + ". Record a baseline here first.")
+        problems = regressions(results, baseline, args.tolerance, args.speed)
+        for problem in problems:
+            print(f"REGRESSION {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}.")
+
+
+if __name__ == '__main__':
+    main()
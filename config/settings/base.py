@@ -2,6 +2,7 @@
 Base settings to build other settings files upon.
 """
 
+import os
 from pathlib import Path
 
 import environ
@@ -281,4 +282,23 @@ SOCIALACCOUNT_ADAPTER = (
 # ------------------------------------------------------------------------------
 ACCOUNT_FORMS = {
     'signup': 'courseplanner.users.forms.CustomSignupForm',
-}
\ No newline at end of file
+}
+
+# Seconds the multi-curriculum optimizer may spend improving a plan's group choices
+PLANNER_OPTIMIZER_TIME_BUDGET = env.float("PLANNER_OPTIMIZER_TIME_BUDGET", 0.25)
+# Seconds a generated plan stays in the cache; coursework and catalog changes invalidate it sooner
+PLAN_CACHE_TIMEOUT = env.int("PLAN_CACHE_TIMEOUT", 60 * 60 * 24)
+# Most parsed transcripts kept in the cache; the oldest are evicted first
+TRANSCRIPT_CACHE_MAX_ENTRIES = env.int("TRANSCRIPT_CACHE_MAX_ENTRIES", 1000)
+# Seconds a parsed transcript stays in the cache, which also bounds entries the index lost track of
+TRANSCRIPT_CACHE_TIMEOUT = env.int("TRANSCRIPT_CACHE_TIMEOUT", 60 * 60 * 24 * 30)
+# Worker processes that extract text from long transcripts in parallel; 1 always extracts in the request's process
+TRANSCRIPT_WORKERS = env.int("TRANSCRIPT_WORKERS", min(4, os.cpu_count() or 1))
+# Transcripts shorter than this are extracted serially, since starting the workers would cost more than it saves
+TRANSCRIPT_PARALLEL_MIN_PAGES = env.int("TRANSCRIPT_PARALLEL_MIN_PAGES", 16)
+# Hash uploads as they stream in so repeat transcript uploads can skip parsing
+FILE_UPLOAD_HANDLERS = [
+    "courseplanner.utils.transcripts.HashingUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
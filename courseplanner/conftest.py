@@ -1,4 +1,6 @@
 import pytest
+from django.core.cache import cache
+from django.db import transaction
 from django.test import RequestFactory
 
 from courseplanner.users.models import User
@@ -10,6 +12,20 @@ def media_storage(settings, tmpdir):
     settings.MEDIA_ROOT = tmpdir.strpath
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def immediate_on_commit(request, monkeypatch):
+    # Non-transactional tests never commit, so commit hooks run as soon as they are registered
+    marker = request.node.get_closest_marker("django_db")
+    if "transactional_db" in request.fixturenames or (marker and marker.kwargs.get("transaction")):
+        return
+    monkeypatch.setattr(transaction, "on_commit", lambda func, using=None, robust=False: func())
+
+
 @pytest.fixture
 def user() -> User:
     return UserFactory()
@@ -1,2 +1,47 @@
 /* Project specific Javascript goes here. */
 
+
+/* Draws the plan's prerequisite graph from users:plan_graph_json as SVG. */
+document.querySelectorAll('svg.plan-graph').forEach(function (svg) {
+  var NS = 'http://www.w3.org/2000/svg';
+  var COLUMN = 140, ROW = 60, RADIUS = 26;
+
+  function element(name, attributes) {
+    var node = document.createElementNS(NS, name);
+    Object.keys(attributes).forEach(function (key) { node.setAttribute(key, attributes[key]); });
+    return node;
+  }
+
+  fetch(svg.dataset.url, {credentials: 'same-origin'})
+    .then(function (response) { return response.json(); })
+    .then(function (graph) {
+      var field = {};
+      graph.fields.forEach(function (name, index) { field[name] = index; });
+      var xs = graph.nodes.map(function (node) { return node[field.x]; });
+      var ys = graph.nodes.map(function (node) { return node[field.y]; });
+      var minY = Math.min.apply(null, ys.concat(0)), maxY = Math.max.apply(null, ys.concat(0));
+      var width = (Math.max.apply(null, xs.concat(0)) + 1) * COLUMN;
+      var height = (maxY - minY + 1) * ROW;
+
+      function position(node) {
+        return [node[field.x] * COLUMN + COLUMN / 2, (maxY - node[field.y]) * ROW + ROW / 2];
+      }
+
+      svg.setAttribute('viewBox', '0 0 ' + width + ' ' + height);
+      graph.edges.forEach(function (edge) {
+        var from = position(graph.nodes[edge[0]]), to = position(graph.nodes[edge[1]]);
+        svg.appendChild(element('line', {x1: from[0], y1: from[1], x2: to[0], y2: to[1], stroke: 'black'}));
+      });
+      graph.nodes.forEach(function (node) {
+        var at = position(node);
+        var title = element('title', {});
+        title.textContent = node[field.code] + ' (' + node[field.credits] + ' credits)';
+        var circle = element('circle', {cx: at[0], cy: at[1], r: RADIUS, fill: 'skyblue'});
+        circle.appendChild(title);
+        svg.appendChild(circle);
+        var label = element('text', {x: at[0], y: at[1] + 4, 'text-anchor': 'middle', 'font-size': 10});
+        label.textContent = node[field.code];
+        svg.appendChild(label);
+      });
+    });
+});
@@ -4,9 +4,11 @@ from django.contrib.auth import get_user_model
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.shortcuts import render
-from django.utils.html import format_html
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 
 from courseplanner.users.forms import (
+    CourseAdminForm,
     UserChangeForm,
     UserCreationForm,
 )
@@ -17,6 +19,7 @@ from courseplanner.users.models import (
     CourseGroup,
     Requirement,
     Curriculum,
+    Plan,
 )
 
 User = get_user_model()
@@ -38,8 +41,14 @@ class UserCourseAdmin(admin.ModelAdmin):
 
 admin.site.register(CourseTerm)
 
+@admin.register(Plan)
+class PlanAdmin(admin.ModelAdmin):
+    list_display = ['user', 'first_term', 'credit_limit', 'updated']
+    search_fields = ['user__username']
+
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
+    form = CourseAdminForm
 
     # Allows the ManyToMany 'offered' field to be represented in the list display
     def terms_to_string(self, obj):
@@ -53,6 +62,7 @@ class CourseAdmin(admin.ModelAdmin):
 
 class CourseInline(admin.StackedInline):
     model = Course
+    form = CourseAdminForm
     extra = 1
 
 class CourseGroupInline(admin.TabularInline):
@@ -73,12 +83,7 @@ class CurriculumAdmin(admin.ModelAdmin):
     list_display = ['name', 'program_type', 'representation']
     filter_horizontal = ['requirements']
 
+    # Rendered from the catalog snapshot's cached outline, so listing curriculums adds no queries per row
     def representation(self, obj):
-
-        print(obj.display())
-        return format_html(obj.display().replace('\n', '<br/>').replace('\t', '|---'))
-
-
-
-    representation.short_description = 'Visualization'
-    representation.allow_tags = True
\ No newline at end of file
+        return mark_safe(escape(obj.display()).replace('\n', '<br/>').replace('\t', '|---'))
+    representation.short_description = 'Visualization'
\ No newline at end of file
@@ -4,7 +4,8 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import FileExtensionValidator
 from allauth.account.forms import SignupForm
-from .models import Term, UserCourse
+from .models import Course, Term, UserCourse
+from ..utils.closure import check_requisites
 from ..utils.utils import get_graduation_years
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Field
@@ -87,7 +88,7 @@ class TranscriptUploadForm(form.Form):
         label='Upload Transcript',
         validators=[FileExtensionValidator(allowed_extensions=["pdf"])],
         required=False,
-        help_text="This will overwrite current courses."
+        help_text="Courses in the terms on your transcript will be replaced by it."
     )
 
 
@@ -117,6 +118,21 @@ class CourseInputForm(form.ModelForm):
             'grade': 'Grade',
         }
 
+# Used by the admin so a requisite cycle is reported on the form rather than failing while saving
+class CourseAdminForm(form.ModelForm):
+
+    class Meta:
+        model = Course
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk is not None:
+            requisites = [course.pk for field in ('prerequisites', 'corequisites')
+                          for course in cleaned_data.get(field) or ()]
+            check_requisites(self.instance.pk, requisites)
+        return cleaned_data
+
 class CustomSignupForm(SignupForm):
     POSSIBLE_YEARS = get_graduation_years()
     expected_grad_year = form.ChoiceField(
@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+
+import networkx as nx
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.course_util import (
+    build_graph,
+    build_requirements,
+    completed_courses_by_user,
+    generate,
+    plan_terms,
+)
+from courseplanner.utils.graph_image import graph_data_key, graph_hash, graph_payload
+from courseplanner.utils.plan_cache import plan_cache_key, user_plan_key
+from courseplanner.utils.plans import plan_fields
+from courseplanner.users.models import Plan
+
+User = get_user_model()
+
+# Planning stages timed in each worker, in pipeline order
+STAGES = ('requirements', 'graph', 'schedule', 'payload')
+
+# Set in the parent before forking so workers share the snapshot copy-on-write
+_catalog = None
+_credit_limit = None
+
+
+def plan(job):
+    curriculums, completed = job
+    timings = {}
+
+    start = time.perf_counter()
+    requirements = build_requirements(curriculums, _catalog, completed)
+    timings['requirements'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    graph = build_graph(requirements, _catalog, completed)
+    timings['graph'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    semesters = generate(graph, _credit_limit)
+    timings['schedule'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    digest = graph_hash(graph)
+    payload = graph_payload(graph, semesters, digest)
+    timings['payload'] = time.perf_counter() - start
+
+    return (semesters, payload), nx.node_link_data(graph), timings
+
+
+class Command(BaseCommand):
+    help = "Generates and caches course plans for every student, or a filtered set, across a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('usernames', nargs='*', help="Only plan for these users.")
+        parser.add_argument('--curriculum', type=int, action='append', dest='curriculums',
+                            help="Only plan for users enrolled in this curriculum pk. May be repeated.")
+        parser.add_argument('--grad-year', type=int, help="Only plan for users expecting to graduate this year.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--credit-limit', type=int, default=16)
+        parser.add_argument('--chunksize', type=int, default=16)
+
+    def handle(self, *args, **options):
+        global _catalog, _credit_limit
+        timings = {}
+        started = time.perf_counter()
+
+        start = time.perf_counter()
+        _catalog = get_catalog()
+        _credit_limit = options['credit_limit']
+        timings['catalog'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        users = User.objects.all()
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+        if options['curriculums']:
+            users = users.filter(curriculums__in=options['curriculums']).distinct()
+        if options['grad_year']:
+            users = users.filter(expected_grad_year=options['grad_year'])
+
+        user_pks = list(users.values_list('pk', flat=True))
+        curriculums = defaultdict(list)
+        enrollments = User.curriculums.through.objects.filter(user__in=user_pks).values_list('user_id', 'curriculum_id')
+        for user_pk, curriculum_pk in enrollments:
+            curriculums[user_pk].append(curriculum_pk)
+        completed = completed_courses_by_user(user_pks, _catalog)
+        first_term, _ = next(plan_terms())
+
+        # Students with the same curriculums and completed courses share one plan
+        keys = {}
+        jobs = {}
+        for user_pk in user_pks:
+            job = (tuple(sorted(curriculums[user_pk])), completed.get(user_pk, frozenset()))
+            key = plan_cache_key(job[0], [_catalog.pks[course] for course in job[1]],
+                                 _credit_limit, _catalog.version, first_term)
+            keys[user_pk] = key
+            jobs.setdefault(key, job)
+        timings['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = self.run_jobs(list(jobs.values()), options['workers'], options['chunksize'])
+        timings['plan'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stage_totals = dict.fromkeys(STAGES, 0.0)
+        entries = {}
+        timeout = getattr(settings, 'PLAN_CACHE_TIMEOUT', 60 * 60 * 24)
+        for key, (result, graph, plan_timings) in zip(jobs, results):
+            entries[key] = result
+            entries[graph_data_key(result[1]['hash'])] = graph
+            for stage, elapsed in plan_timings.items():
+                stage_totals[stage] += elapsed
+        cache.set_many(entries, timeout)
+        cache.set_many({user_plan_key(user_pk): key for user_pk, key in keys.items()}, None)
+
+        stored = []
+        for user_pk, key in keys.items():
+            job_curriculums, job_completed = jobs[key]
+            stored.append(Plan(user_id=user_pk, **plan_fields(
+                entries[key][0], _catalog, job_curriculums, job_completed, _credit_limit, first_term,
+            )))
+        with transaction.atomic():
+            Plan.objects.filter(user__in=user_pks).delete()
+            Plan.objects.bulk_create(stored, batch_size=500)
+        timings['write'] = time.perf_counter() - start
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Planned {len(user_pks)} users ({len(jobs)} distinct plans) in {elapsed:.2f}s, "
+            f"{len(user_pks) / elapsed if elapsed else 0:.1f} plans/sec."
+        ))
+        for stage, seconds in timings.items():
+            self.stdout.write(f"  {stage:<14}{seconds * 1000:>10.1f} ms")
+        self.stdout.write("Per plan, summed across workers:")
+        for stage in STAGES:
+            average = stage_totals[stage] / len(jobs) if jobs else 0
+            self.stdout.write(f"  {stage:<14}{stage_totals[stage] * 1000:>10.1f} ms  ({average * 1e6:.0f} us/plan)")
+
+    def run_jobs(self, jobs, workers, chunksize):
+        if workers <= 1 or len(jobs) < 2 or 'fork' not in multiprocessing.get_all_start_methods():
+            return [plan(job) for job in jobs]
+
+        # Forked workers must not inherit open database connections; planning never queries anyway.
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(workers) as pool:
+            return pool.map(plan, jobs, chunksize)
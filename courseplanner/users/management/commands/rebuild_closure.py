@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from courseplanner.utils.catalog import bump_catalog_version
+from courseplanner.utils.closure import rebuild_closure
+from courseplanner.users.models import PrerequisiteClosure
+
+
+class Command(BaseCommand):
+    help = "Recomputes the whole PrerequisiteClosure table, e.g. after raw SQL edits to course requisites."
+
+    def handle(self, *args, **options):
+        rebuild_closure()
+        bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {PrerequisiteClosure.objects.count()} closure rows."))
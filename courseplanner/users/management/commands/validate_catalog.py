@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courseplanner.utils.closure import find_cycles, load_requisites
+from courseplanner.users.models import Course
+
+
+class Command(BaseCommand):
+    help = "Checks the whole catalog for prerequisite and corequisite cycles in linear time, e.g. after an import."
+
+    def handle(self, *args, **options):
+        requisites = load_requisites()
+        codes = dict(Course.objects.values_list('pk', 'code'))
+
+        cycles = 0
+        for cycle in find_cycles(requisites):
+            cycles += 1
+            self.stderr.write("Prerequisite cycle: " + " requires ".join(codes[course] for course in cycle))
+
+        edges = sum(len(courses) for courses in requisites.values())
+        if cycles:
+            raise CommandError(f"Found {cycles} prerequisite cycle(s) among {len(codes)} courses.")
+        self.stdout.write(self.style.SUCCESS(
+            f"No prerequisite cycles among {len(codes)} courses and {edges} requisites."
+        ))
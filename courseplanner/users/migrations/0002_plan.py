@@ -0,0 +1,29 @@
+# Generated by Django 3.1.1 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Plan',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('catalog_version', models.BigIntegerField()),
+                ('credit_limit', models.PositiveSmallIntegerField()),
+                ('first_term', models.CharField(max_length=12)),
+                ('curriculums', models.JSONField(default=list)),
+                ('completed', models.JSONField(default=list)),
+                ('semesters', models.JSONField(default=list)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='plan', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
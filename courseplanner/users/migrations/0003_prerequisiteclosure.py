@@ -0,0 +1,53 @@
+# Generated by Django 3.1.1 on 2026-10-18 13:40
+
+from collections import deque
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_closure(apps, schema_editor):
+    Course = apps.get_model('users', 'Course')
+    PrerequisiteClosure = apps.get_model('users', 'PrerequisiteClosure')
+
+    requisites = {}
+    for through in (Course.prerequisites.through, Course.corequisites.through):
+        for course, requisite in through.objects.values_list('from_course_id', 'to_course_id'):
+            requisites.setdefault(course, []).append(requisite)
+
+    rows = []
+    for course in Course.objects.values_list('pk', flat=True):
+        depths = {}
+        pending = deque((requisite, 1) for requisite in requisites.get(course, ()))
+        while pending:
+            requisite, depth = pending.popleft()
+            if requisite in depths:
+                continue
+            depths[requisite] = depth
+            pending.extend((other, depth + 1) for other in requisites.get(requisite, ()))
+        rows.extend(PrerequisiteClosure(course_id=course, prerequisite_id=requisite, depth=depth)
+                    for requisite, depth in depths.items())
+    PrerequisiteClosure.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_plan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrerequisiteClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prerequisite_closure', to='users.course')),
+                ('prerequisite', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dependent_closure', to='users.course')),
+            ],
+            options={
+                'unique_together': {('course', 'prerequisite')},
+            },
+        ),
+        migrations.RunPython(build_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.1 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_prerequisiteclosure'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='plan',
+            name='catalog_version',
+            field=models.CharField(max_length=32),
+        ),
+    ]
@@ -1,9 +1,11 @@
-import random
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 from ..utils.utils import get_graduation_years
+from ..utils.catalog import get_catalog
+from ..utils.requirements import curriculum_outline, format_requirement, node_credits, requirement_tree
+from ..utils.solver import satisfiable_subset
 
 class Term(models.TextChoices):
     FALL = 'Fall', _('Fall')
@@ -11,6 +13,9 @@ class Term(models.TextChoices):
     SUMMER = 'Summer', _('Summer')
     WINTER = 'Winter', _('Winter')
 
+# Each term is given one bit so that a course's offered terms fit in a single int
+TERM_BITS = {term: 1 << index for index, term in enumerate(Term.values)}
+
 class Grade(models.TextChoices):
     A = 'A', _('A')
     A_MINUS = 'A-', _('A-')
@@ -30,6 +35,12 @@ class Grade(models.TextChoices):
     WITHDRAWFAIL = 'WF', _('Withdraw Fail')
     WITHDRAWPASS = 'WP', _('Withdraw Pass')
 
+# Grades that count a course as completed when planning
+PASSING_GRADES = {
+    Grade.A, Grade.A_MINUS, Grade.B_PLUS, Grade.B, Grade.B_MINUS, Grade.C_PLUS, Grade.C,
+    Grade.C_MINUS, Grade.D_PLUS, Grade.D, Grade.PASS, Grade.CREDIT,
+}
+
 # The degree requirements consist of
 # 1) General Education
 # 2) Quantitative Requirements
@@ -71,30 +82,36 @@ class CourseTerm(models.Model):
     def __str__(self):
         return self.name
 
-# Abstract class for Course, CourseGroup, and possibly others
+# Abstract class for Course, CourseGroup, and possibly others.
+# Dispatch goes through the typed requirement tree of the catalog snapshot rather than per-subclass queries.
 class Requirement(models.Model):
 
-    def get_satisfiable_subset(self):
-        if hasattr(self, 'course'):
-            return self.course.get_satisfiable_subset() 
-        elif hasattr(self, 'coursegroup'):
-            return self.coursegroup.get_satisfiable_subset() 
-        raise NotImplementedError("This class is abstract -- method needs to be implemented in the child class.")
-    
+    # Typed tree node of this requirement, or None if it isn't in the catalog snapshot
+    def get_node(self):
+        catalog = get_catalog()
+        if self.pk in catalog.pk_index or self.pk in catalog.groups:
+            return requirement_tree(self.pk, catalog)
+        return None
+
+    # Courses chosen to satisfy this requirement, given the catalog ids of completed courses
+    def get_satisfiable_subset(self, completed=frozenset()) -> set:
+        if self.get_node() is None:
+            raise NotImplementedError("This class is abstract -- method needs to be implemented in the child class.")
+        catalog = get_catalog()
+        chosen = satisfiable_subset(self.pk, catalog, completed)
+        return set(Course.objects.filter(pk__in=[catalog.pks[course] for course in chosen]))
+
     def get_credits(self):
-        if hasattr(self, 'course'):
-            return self.course.get_credits() 
-        elif hasattr(self, 'coursegroup'):
-            return self.coursegroup.get_credits() 
-        raise NotImplementedError("This class is abstract -- method needs to be implemented in the child class.")
+        node = self.get_node()
+        if node is None:
+            raise NotImplementedError("This class is abstract -- method needs to be implemented in the child class.")
+        return node_credits(node)
 
     def __str__(self):
-        if hasattr(self, 'course'):
-            return str(self.course)  
-        elif hasattr(self, 'coursegroup'):
-            return str(self.coursegroup)
-        else:
+        node = self.get_node()
+        if node is None:
             return super().__str__()
+        return format_requirement(node)
         
     # def __repr__(self) -> str:
     #     return str(self)
@@ -110,44 +127,41 @@ class Course(Requirement):
     prerequisites = models.ManyToManyField('self', related_name="prereqs", symmetrical=False, blank=True)
     corequisites = models.ManyToManyField('self', related_name="coreqs", symmetrical=False, blank=True)
 
-    def get_satisfiable_subset(self) -> set:
+    def get_satisfiable_subset(self, completed=frozenset()) -> set:
         return set([self])
     
     def get_credits(self) -> int:
         return self.credits
 
+    # Every transitive prerequisite and corequisite, nearest first, in a single query on the closure table
+    def get_all_prerequisites(self):
+        return Course.objects.filter(dependent_closure__course=self).order_by('dependent_closure__depth', 'code')
+
     def __str__(self):
         return f'{self.code}\n'
 
-# Represents a collection of courses with a minimum credit requirement in order to be satisfied
+# Transitive closure of Course.prerequisites and Course.corequisites, kept up to date from signals (see utils.closure)
+class PrerequisiteClosure(models.Model):
+
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='prerequisite_closure')
+    prerequisite = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='dependent_closure')
+    depth = models.PositiveSmallIntegerField()  # fewest requisite links from course to prerequisite
+
+    class Meta:
+        unique_together = [('course', 'prerequisite')]
+
+    def __str__(self):
+        return f'{self.course.code} needs {self.prerequisite.code} ({self.depth})'
+
+# Represents a collection of courses with a minimum credit requirement in order to be satisfied.
+# The satisfiable subset comes from the deterministic group solver and __str__ walks the requirement tree.
 class CourseGroup(Requirement):
 
     requirements = models.ManyToManyField(Requirement, related_name='requirements')
     minimum_credits = models.PositiveSmallIntegerField()
 
-    def get_satisfiable_subset(self) -> set:
-        accumulated_credits = 0
-        satisfiable_subset = []
-        all_reqs = list(self.requirements.all())
-
-        # Keep selecting random requirements until credit constraint is satisfied
-        while accumulated_credits < self.get_credits():
-            # Error check here... "is requirement_set empty?"
-            random_requirement = random.choice(all_reqs)
-            all_reqs.remove(random_requirement)
-            satisfiable_subset += random_requirement.get_satisfiable_subset()
-            accumulated_credits += random_requirement.get_credits()
-
-        return set(satisfiable_subset)
-    
     def get_credits(self) -> int:
         return self.minimum_credits
-    
-    def __str__(self):
-        result = f"CourseGroup ({self.minimum_credits} credits)\n"
-        for requirement in self.requirements.all():
-            result += f"\t{requirement}"
-        return result
 
 class Curriculum(models.Model):
     PROGRAM_TYPES = [
@@ -162,10 +176,22 @@ class Curriculum(models.Model):
     program_type = models.CharField(max_length=4, choices=PROGRAM_TYPES, default='MAJ')
 
     def display(self):
-        result = ""
-        for requirement in self.requirements.all():
-            result += f"{requirement}"
-        return result
+        return curriculum_outline(self.pk, get_catalog())
+
+    def __str__(self):
+        return f'{self.name} | {self.get_program_type_display()}'
+
+# A student's most recent plan, kept so that coursework edits only re-plan the affected semesters
+class Plan(models.Model):
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='plan')
+    catalog_version = models.CharField(max_length=32)
+    credit_limit = models.PositiveSmallIntegerField()
+    first_term = models.CharField(max_length=12)
+    curriculums = models.JSONField(default=list)  # sorted Curriculum pks
+    completed = models.JSONField(default=list)    # sorted Course pks
+    semesters = models.JSONField(default=list)    # [[term label, [Course pks in order]], ...]
+    updated = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return f'{self.name} | {self.get_program_type_display()}' 
\ No newline at end of file
+        return f'Plan for {self.user} ({len(self.semesters)} semesters)'
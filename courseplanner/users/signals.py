@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    User,
+    UserCourse,
+    Course,
+    CourseGroup,
+    Requirement,
+    Curriculum,
+    PrerequisiteClosure,
+)
+from ..utils.catalog import bump_catalog_version
+from ..utils.closure import check_requisites, refresh_closure
+from ..utils.plan_cache import invalidate_user_plan
+
+CATALOG_MODELS = (Course, Requirement, CourseGroup, Curriculum)
+CATALOG_RELATIONS = (
+    Course.prerequisites.through,
+    Course.corequisites.through,
+    Course.offered.through,
+    CourseGroup.requirements.through,
+    Curriculum.requirements.through,
+)
+REQUISITE_RELATIONS = (Course.prerequisites.through, Course.corequisites.through)
+
+# Any change to the catalog invalidates the in-memory snapshot held by each process.
+# The version only moves on once the change is committed: a worker that reloaded the catalog before then would
+# read the old rows and keep them under the new version.
+@receiver(post_save)
+@receiver(post_delete)
+def catalog_changed(sender, **kwargs):
+    if sender in CATALOG_MODELS:
+        transaction.on_commit(bump_catalog_version)
+
+# New requisite edges are rejected before they are written if they would close a cycle
+@receiver(m2m_changed)
+def requisites_adding(sender, instance, action, reverse, pk_set, **kwargs):
+    if sender not in REQUISITE_RELATIONS or action != 'pre_add':
+        return
+    if reverse:
+        for course_pk in pk_set:
+            check_requisites(course_pk, {instance.pk})
+    else:
+        check_requisites(instance.pk, pk_set)
+
+@receiver(m2m_changed)
+def catalog_relation_changed(sender, instance, action, pk_set, reverse, **kwargs):
+    if sender not in CATALOG_RELATIONS or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    # The closure is refreshed in the same transaction, so a catalog reloaded after the commit never sees it stale.
+    # Only the courses whose own requisites changed are refreshed; the closure of a requisite stays the same.
+    # A reverse clear doesn't say which courses lost the requisite, but they are all among its dependents.
+    if sender in REQUISITE_RELATIONS:
+        refresh_closure(pk_set if reverse and pk_set else {instance.pk})
+    transaction.on_commit(bump_catalog_version)
+
+# Requisite rows removed along with a course don't send m2m_changed, so its dependents are refreshed here
+@receiver(pre_delete, sender=Course)
+def course_deleting(sender, instance, **kwargs):
+    instance._closure_dependents = list(
+        PrerequisiteClosure.objects.filter(prerequisite=instance).values_list('course_id', flat=True)
+    )
+
+@receiver(post_delete, sender=Course)
+def course_deleted(sender, instance, **kwargs):
+    refresh_closure(getattr(instance, '_closure_dependents', ()))
+    transaction.on_commit(bump_catalog_version)
+
+# A student's cached plan is stale once their coursework or curriculums change.
+@receiver(post_save, sender=UserCourse)
+@receiver(post_delete, sender=UserCourse)
+def coursework_changed(sender, instance, **kwargs):
+    invalidate_user_plan(instance.user_id)
+
+@receiver(m2m_changed, sender=User.curriculums.through)
+def user_curriculums_changed(sender, instance, action, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if isinstance(instance, User):
+        invalidate_user_plan(instance.pk)
+    else:
+        for user_pk in pk_set or ():
+            invalidate_user_plan(user_pk)
@@ -1,9 +1,18 @@
 from typing import Any, Sequence
 
 from django.contrib.auth import get_user_model
-from factory import Faker, post_generation
+import factory
+from factory import Faker, SubFactory, post_generation
 from factory.django import DjangoModelFactory
 
+from courseplanner.users.models import (
+    Course,
+    CourseGroup,
+    Curriculum,
+    Grade,
+    UserCourse,
+)
+
 
 class UserFactory(DjangoModelFactory):
 
@@ -32,3 +41,57 @@ class UserFactory(DjangoModelFactory):
     class Meta:
         model = get_user_model()
         django_get_or_create = ["username"]
+
+
+class CourseFactory(DjangoModelFactory):
+
+    code = factory.Sequence(lambda n: f"CS {100 + n}")
+    credits = 3
+    name = Faker("catch_phrase")
+    description = ""
+
+    @post_generation
+    def prerequisites(self, create: bool, extracted: Sequence[Any], **kwargs):
+        if create and extracted:
+            self.prerequisites.add(*extracted)
+
+    class Meta:
+        model = Course
+        django_get_or_create = ["code"]
+
+
+class CourseGroupFactory(DjangoModelFactory):
+
+    minimum_credits = 3
+
+    @post_generation
+    def requirements(self, create: bool, extracted: Sequence[Any], **kwargs):
+        if create and extracted:
+            self.requirements.add(*extracted)
+
+    class Meta:
+        model = CourseGroup
+
+
+class CurriculumFactory(DjangoModelFactory):
+
+    name = Faker("job")
+
+    @post_generation
+    def requirements(self, create: bool, extracted: Sequence[Any], **kwargs):
+        if create and extracted:
+            self.requirements.add(*extracted)
+
+    class Meta:
+        model = Curriculum
+
+
+class UserCourseFactory(DjangoModelFactory):
+
+    user = SubFactory(UserFactory)
+    code = factory.Sequence(lambda n: f"CS {100 + n}")
+    credits = 3
+    grade = Grade.A
+
+    class Meta:
+        model = UserCourse
@@ -0,0 +1,71 @@
+import pytest
+from django.urls import reverse
+
+from courseplanner.users.tests.factories import (
+    CourseFactory,
+    CourseGroupFactory,
+    CurriculumFactory,
+    UserCourseFactory,
+    UserFactory,
+)
+from courseplanner.utils.audit import PARTIAL, REMAINING, SATISFIED, audit_curriculums
+from courseplanner.utils.catalog import get_catalog
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def curriculum():
+    intro = CourseFactory(code="CS 149", credits=3)
+    data = CourseFactory(code="CS 240", credits=3)
+    systems = CourseFactory(code="CS 261", credits=4)
+    theory = CourseFactory(code="MATH 245", credits=3)
+    nested = CourseGroupFactory(minimum_credits=3, requirements=[theory])
+    electives = CourseGroupFactory(minimum_credits=7, requirements=[data, systems, nested])
+    return CurriculumFactory(requirements=[intro, electives])
+
+
+def test_audit_statuses(curriculum):
+    catalog = get_catalog()
+    completed = catalog.ids(["CS 149", "CS 261"])
+
+    audit, = audit_curriculums([curriculum.pk], catalog, completed)
+    intro, electives = audit.requirements
+
+    assert intro.status == SATISFIED
+    assert (electives.status, electives.earned, electives.required) == (PARTIAL, 4, 7)
+    assert [child.status for child in electives.children] == [REMAINING, SATISFIED, REMAINING]
+    assert (audit.status, audit.earned, audit.required) == (PARTIAL, 7, 10)
+
+
+def test_nested_group_completes_parent(curriculum):
+    catalog = get_catalog()
+    completed = catalog.ids(["CS 149", "CS 261", "MATH 245"])
+
+    audit, = audit_curriculums([curriculum.pk], catalog, completed)
+
+    assert audit.status == SATISFIED
+    assert audit.earned == audit.required == 10
+
+
+def test_user_detail_shows_audit(client, user, curriculum):
+    user.curriculums.add(curriculum)
+    UserCourseFactory(user=user, code="CS 149", credits=3, grade="A")
+    UserCourseFactory(user=user, code="CS 240", credits=3, grade="F")
+    client.force_login(user)
+
+    response = client.get(reverse("users:detail", kwargs={"username": user.username}))
+
+    audit = response.context["audits"][0][1]
+    assert audit.earned == 3
+    assert "Degree Audit" in response.content.decode()
+
+
+def test_other_users_page_skips_audit(client, user, curriculum):
+    user.curriculums.add(curriculum)
+    client.force_login(UserFactory())
+
+    response = client.get(reverse("users:detail", kwargs={"username": user.username}))
+
+    assert "audits" not in response.context
+    assert "graduation" not in response.context
@@ -0,0 +1,174 @@
+import random
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from courseplanner.users.forms import CourseAdminForm
+from courseplanner.users.models import TERM_BITS, Course, CourseTerm, PrerequisiteClosure
+from courseplanner.utils.catalog import bump_catalog_version, get_catalog, get_catalog_version, load_catalog
+from courseplanner.utils import closure
+from courseplanner.utils.closure import closure_of, load_requisites
+from courseplanner.utils.course_util import build_graph
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def courses():
+    fall = CourseTerm.objects.create(name="Fall")
+    intro = Course.objects.create(code="CS 149", credits=3, name="Intro", description="")
+    data = Course.objects.create(code="CS 240", credits=3, name="Data", description="")
+    algo = Course.objects.create(code="CS 327", credits=4, name="Algo", description="")
+    data.prerequisites.add(intro)
+    algo.prerequisites.add(data)
+    algo.offered.add(fall)
+    return intro, data, algo
+
+
+def test_load_catalog_bulk_queries(courses):
+    with CaptureQueriesContext(connection) as queries:
+        catalog = load_catalog(version=1)
+
+    assert len(queries) == 8
+    assert catalog.codes == ["CS 149", "CS 240", "CS 327"]
+    assert catalog.prerequisites[catalog.index["CS 327"]] == (catalog.index["CS 240"],)
+    assert catalog.offered[catalog.index["CS 327"]] == TERM_BITS["Fall"]
+
+
+def test_catalog_version_bumps_on_change(courses):
+    intro, data, algo = courses
+    catalog = get_catalog()
+    assert get_catalog() is catalog
+
+    algo.prerequisites.remove(data)
+    assert get_catalog_version() != catalog.version
+    assert get_catalog().prerequisites[catalog.index["CS 327"]] == ()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_catalog_version_moves_on_at_commit():
+    version = get_catalog_version()
+
+    with transaction.atomic():
+        Course.objects.create(code="CS 149", credits=3, name="Intro", description="")
+        assert get_catalog_version() == version
+    assert get_catalog_version() != version
+
+
+def test_catalog_version_never_repeats_after_flush(courses):
+    seen = {get_catalog_version()}
+    for _ in range(50):
+        bump_catalog_version()
+        seen.add(get_catalog_version())
+    cache.clear()
+
+    assert get_catalog_version() not in seen
+    assert len(seen) == 51
+
+
+def test_build_graph_without_queries(courses):
+    intro, data, algo = courses
+    catalog = get_catalog()
+
+    with CaptureQueriesContext(connection) as queries:
+        graph = build_graph({catalog.pk_index[algo.pk]}, catalog)
+
+    assert len(queries) == 0
+    assert set(graph.edges) == {("CS 149", "CS 240"), ("CS 240", "CS 327")}
+    assert graph.nodes["CS 327"]["credits"] == 4
+
+
+def test_closure_maintained_from_signals(courses):
+    intro, data, algo = courses
+    assert [(course.code, course.dependent_closure.get(course=algo).depth)
+            for course in algo.get_all_prerequisites()] == [("CS 240", 1), ("CS 149", 2)]
+
+    data.prerequisites.remove(intro)
+    assert list(algo.get_all_prerequisites()) == [data]
+
+    intro.prereqs.add(data)
+    assert set(algo.get_all_prerequisites()) == {data, intro}
+
+    data.delete()
+    assert not algo.get_all_prerequisites().exists()
+
+
+def test_incremental_closure_matches_full_walk():
+    rng = random.Random(0)
+    courses = [Course.objects.create(code=f"CS {number}", credits=3, name="", description="") for number in range(12)]
+    for _ in range(60):
+        course, requisite = sorted(rng.sample(courses, 2), key=lambda course: course.pk, reverse=True)
+        change = rng.choice(["add", "add", "add", "reverse add", "remove", "reverse remove", "clear", "reverse clear"])
+        if change == "add":
+            course.prerequisites.add(requisite)
+        elif change == "reverse add":
+            requisite.prereqs.add(course)
+        elif change == "remove":
+            course.prerequisites.remove(requisite)
+        elif change == "reverse remove":
+            requisite.prereqs.remove(course)
+        elif change == "clear":
+            course.prerequisites.clear()
+        else:
+            requisite.prereqs.clear()
+
+        requisites = load_requisites()
+        expected = {(pk, prerequisite, depth) for pk in requisites
+                    for prerequisite, depth in closure_of(pk, requisites).items()}
+        assert set(PrerequisiteClosure.objects.values_list("course_id", "prerequisite_id", "depth")) == expected
+
+
+def test_closure_refresh_reads_only_affected_requisites(courses):
+    intro, data, algo = courses
+    unrelated = [Course.objects.create(code=f"MATH {number}", credits=3, name="", description="")
+                 for number in range(3)]
+    unrelated[2].prerequisites.add(unrelated[1])
+    unrelated[1].prerequisites.add(unrelated[0])
+
+    with mock.patch.object(closure, "load_requisites", wraps=closure.load_requisites) as load:
+        systems = Course.objects.create(code="CS 261", credits=4, name="Systems", description="")
+        systems.prerequisites.add(data)
+
+    assert load.call_args.args[0] == {systems.pk}
+    assert [(course.code, course.dependent_closure.get(course=systems).depth)
+            for course in systems.get_all_prerequisites()] == [("CS 240", 1), ("CS 149", 2)]
+
+
+def test_build_graph_skips_prerequisites_of_satisfied_courses(courses):
+    intro, data, algo = courses
+    systems = Course.objects.create(code="CS 261", credits=4, name="Systems", description="")
+    systems.prerequisites.add(intro)
+    catalog = get_catalog()
+    satisfied = catalog.ids(["CS 240"])
+
+    graph = build_graph(catalog.ids(["CS 327"]), catalog, satisfied)
+    assert set(graph.nodes) == {"CS 327"}
+
+    graph = build_graph(catalog.ids(["CS 327", "CS 261"]), catalog, satisfied)
+    assert set(graph.edges) == {("CS 149", "CS 261")}
+
+
+def test_requisite_cycle_rejected_with_path(courses):
+    intro, data, algo = courses
+
+    with pytest.raises(ValidationError) as error, transaction.atomic():
+        intro.prerequisites.add(algo)
+    assert error.value.messages == ["Prerequisite cycle: CS 149 requires CS 327 requires CS 240 requires CS 149"]
+
+    with pytest.raises(ValidationError), transaction.atomic():
+        algo.prereqs.add(intro)
+    assert not intro.prerequisites.exists()
+
+
+def test_course_admin_form_reports_cycle(courses):
+    intro, data, algo = courses
+    form = CourseAdminForm(instance=intro, data={
+        "code": intro.code, "credits": 3, "name": "Intro", "description": "-", "prerequisites": [data.pk],
+    })
+
+    assert not form.is_valid()
+    assert "CS 149 requires CS 240 requires CS 149" in form.non_field_errors()[0]
@@ -0,0 +1,60 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from courseplanner.users.models import Course, Plan, PrerequisiteClosure
+from courseplanner.users.tests.factories import (
+    CourseFactory,
+    CurriculumFactory,
+    UserCourseFactory,
+    UserFactory,
+)
+from courseplanner.utils import plan_cache
+from courseplanner.utils.plan_cache import get_course_plan
+
+pytestmark = pytest.mark.django_db
+
+
+def test_generate_plans_warms_plan_cache():
+    intro = CourseFactory(code="CS 149")
+    curriculum = CurriculumFactory(requirements=[intro, CourseFactory(code="CS 240", prerequisites=[intro])])
+    students = UserFactory.create_batch(3)
+    for student in students:
+        student.curriculums.add(curriculum)
+    UserCourseFactory(user=students[0], code="CS 149")
+    out = StringIO()
+
+    call_command("generate_plans", workers=1, stdout=out)
+
+    assert "Planned 3 users (2 distinct plans)" in out.getvalue()
+    assert "plans/sec" in out.getvalue()
+    with mock.patch.object(plan_cache, "generate_course_plan") as generate:
+        assert [courses for _, courses in get_course_plan(students[0], 16)[0]] == [["CS 240"]]
+        assert [courses for _, courses in get_course_plan(students[1], 16)[0]] == [["CS 149"], ["CS 240"]]
+    generate.assert_not_called()
+    assert Plan.objects.get(user=students[0]).semesters[0][1] == [curriculum.requirements.get(course__code="CS 240").pk]
+
+
+def test_rebuild_closure():
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    PrerequisiteClosure.objects.all().delete()
+
+    call_command("rebuild_closure", stdout=StringIO())
+
+    assert list(data.get_all_prerequisites()) == [intro]
+
+
+def test_validate_catalog_reports_cycles():
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    call_command("validate_catalog", stdout=StringIO())
+
+    # Raw imports bypass the write-time check
+    Course.prerequisites.through.objects.create(from_course=intro, to_course=data)
+    stderr = StringIO()
+    with pytest.raises(CommandError):
+        call_command("validate_catalog", stdout=StringIO(), stderr=stderr)
+    assert "CS 149 requires CS 240 requires CS 149" in stderr.getvalue()
@@ -0,0 +1,88 @@
+import datetime
+
+import pytest
+
+from courseplanner.users.models import Grade
+from courseplanner.users.tests.factories import (
+    CourseFactory,
+    CourseGroupFactory,
+    CurriculumFactory,
+    UserCourseFactory,
+)
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.course_util import (
+    build_graph,
+    build_requirements,
+    completed_courses,
+    estimate_graduation,
+)
+from courseplanner.utils.plan_cache import get_course_plan
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def curriculum():
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    algo = CourseFactory(code="CS 327", prerequisites=[data])
+    elective = CourseGroupFactory(minimum_credits=3, requirements=[
+        CourseFactory(code="CS 430"),
+        CourseFactory(code="CS 432"),
+    ])
+    return CurriculumFactory(requirements=[intro, data, algo, elective])
+
+
+def test_completed_courses_only_counts_passing_grades(user):
+    CourseFactory(code="CS 149")
+    CourseFactory(code="CS 240")
+    UserCourseFactory(user=user, code="CS 149", grade=Grade.B)
+    UserCourseFactory(user=user, code="CS 240", grade=Grade.WITHDRAW)
+    UserCourseFactory(user=user, code="BUS OOO", grade=Grade.CREDIT)
+    catalog = get_catalog()
+
+    assert completed_courses(user, catalog) == {catalog.index["CS 149"]}
+
+
+def test_completed_coursework_is_pruned(user, curriculum):
+    UserCourseFactory(user=user, code="CS 149")
+    UserCourseFactory(user=user, code="CS 240")
+    UserCourseFactory(user=user, code="CS 432")
+    user.curriculums.add(curriculum)
+    catalog = get_catalog()
+    satisfied = completed_courses(user, catalog)
+
+    requirements = build_requirements([curriculum.pk], catalog, satisfied)
+    graph = build_graph(requirements, catalog, satisfied)
+
+    assert {catalog.codes[course] for course in requirements} == {"CS 327"}
+    assert list(graph.nodes) == ["CS 327"]
+
+
+def test_estimate_graduation(curriculum):
+    catalog = get_catalog()
+    now = datetime.datetime(2026, 10, 18)
+
+    estimate = estimate_graduation([curriculum.pk], 16, catalog=catalog, expected=("Fall", 2027), now=now)
+    assert estimate.bounds.semesters == estimate.bounds.chain == 3
+    assert (estimate.term, estimate.year, estimate.on_track) == ("Spring", 2028, False)
+
+    satisfied = frozenset(catalog.ids(["CS 149"]))
+    estimate = estimate_graduation([curriculum.pk], 16, satisfied, catalog, expected=("Fall", 2027), now=now)
+    assert (estimate.term, estimate.year, estimate.on_track) == ("Fall", 2027, True)
+
+
+def test_estimate_graduation_is_a_lower_bound_for_shared_groups(user):
+    first = CourseFactory(code="CS 430", credits=3)
+    shared = CourseFactory(code="CS 432", credits=3)
+    major = CurriculumFactory(requirements=[CourseGroupFactory(minimum_credits=3, requirements=[first, shared])])
+    minor = CurriculumFactory(requirements=[CourseGroupFactory(minimum_credits=3, requirements=[
+        shared, CourseFactory(code="MATH 432", credits=3),
+    ])])
+    user.curriculums.add(major, minor)
+    catalog = get_catalog()
+
+    estimate = estimate_graduation([major.pk, minor.pk], 3, catalog=catalog)
+    semesters, _ = get_course_plan(user, 3)
+
+    assert estimate.bounds.semesters == len(semesters) == 1
@@ -0,0 +1,72 @@
+import networkx as nx
+import pytest
+from django.urls import reverse
+
+from courseplanner.users.tests.factories import CourseFactory, CurriculumFactory
+from courseplanner.utils.graph_image import (
+    graph_hash,
+    layered_layout,
+    remember_graph,
+    store_graph_image,
+)
+from courseplanner.utils import graph_image
+
+pytestmark = pytest.mark.django_db
+
+
+class IdleExecutor:
+    def submit(self, *args):
+        pass
+
+
+def plan_graph():
+    graph = nx.DiGraph()
+    for code in ["CS 149", "CS 159", "CS 240", "MATH 231"]:
+        graph.add_node(code, credits=3)
+    graph.add_edge("CS 149", "CS 159")
+    graph.add_edge("CS 159", "CS 240")
+    graph.add_edge("CS 149", "CS 240")
+    return graph
+
+
+def test_layered_layout_places_courses_by_depth():
+    layout = layered_layout(plan_graph())
+
+    assert {node: x for node, (x, _) in layout.items()} == {"CS 149": 0, "MATH 231": 0, "CS 159": 1, "CS 240": 2}
+    assert layout == layered_layout(plan_graph())
+
+
+def test_graph_hash_is_content_based():
+    reordered = nx.DiGraph()
+    reordered.add_nodes_from(reversed(list(plan_graph().nodes(data=True))))
+    reordered.add_edges_from(plan_graph().edges)
+
+    assert graph_hash(reordered) == graph_hash(plan_graph())
+
+
+def test_image_served_once_rendered(client, user, monkeypatch):
+    monkeypatch.setattr(graph_image, "get_executor", IdleExecutor)
+    client.force_login(user)
+    digest = remember_graph(plan_graph())
+    url = reverse("users:plan_graph", kwargs={"digest": digest})
+
+    assert client.get(url).status_code == 202
+
+    store_graph_image(digest, plan_graph())
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "image/png"
+    assert "immutable" in response["Cache-Control"]
+    assert client.get(reverse("users:plan_graph", kwargs={"digest": "0" * 64})).status_code == 404
+
+
+def test_graph_json(client, user):
+    intro = CourseFactory(code="CS 149")
+    user.curriculums.add(CurriculumFactory(requirements=[CourseFactory(code="CS 240", prerequisites=[intro])]))
+    client.force_login(user)
+
+    graph = client.get(reverse("users:plan_graph_json")).json()
+
+    assert graph["fields"] == ["code", "credits", "semester", "x", "y"]
+    assert graph["nodes"] == [["CS 149", 3, 0, 0, 0.0], ["CS 240", 3, 1, 1, 0.0]]
+    assert graph["edges"] == [[0, 1]]
@@ -0,0 +1,47 @@
+import pytest
+
+from courseplanner.users.tests.factories import (
+    CourseFactory,
+    CourseGroupFactory,
+    CurriculumFactory,
+)
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.optimizer import chain_length, optimize_requirements
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def programs():
+    first = CourseFactory(code="CS 430")
+    shared = CourseFactory(code="CS 432")
+    last = CourseFactory(code="MATH 432")
+    major = CurriculumFactory(requirements=[CourseGroupFactory(minimum_credits=3, requirements=[first, shared])])
+    minor = CurriculumFactory(requirements=[CourseGroupFactory(minimum_credits=3, requirements=[shared, last])])
+    return major, minor
+
+
+def test_groups_share_courses_across_curriculums(programs):
+    catalog = get_catalog()
+
+    chosen = optimize_requirements([program.pk for program in programs], catalog)
+
+    assert {catalog.codes[course] for course in chosen} == {"CS 432"}
+
+
+def test_time_budget_falls_back_to_group_solver(programs):
+    catalog = get_catalog()
+
+    chosen = optimize_requirements([program.pk for program in programs], catalog, time_budget=0)
+
+    assert {catalog.codes[course] for course in chosen} == {"CS 430", "CS 432"}
+
+
+def test_chain_length():
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    CourseFactory(code="CS 327", prerequisites=[data, intro])
+    catalog = get_catalog()
+
+    assert chain_length(set(range(len(catalog))), catalog) == 3
+    assert chain_length(catalog.ids(["CS 149", "CS 327"]), catalog) == 2
@@ -0,0 +1,141 @@
+import threading
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from courseplanner.users.tests.factories import (
+    CourseFactory,
+    CurriculumFactory,
+    UserCourseFactory,
+)
+from courseplanner.users.models import Plan
+from courseplanner.utils import course_util, plan_cache
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.plans import stored_requirements
+from courseplanner.utils.plan_cache import get_course_plan, single_flight, user_plan_key
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def planned_user(user):
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    user.curriculums.add(CurriculumFactory(requirements=[intro, data]))
+    return user
+
+
+def test_repeat_plans_come_from_cache(planned_user):
+    with mock.patch.object(plan_cache, "generate_course_plan", wraps=plan_cache.generate_course_plan) as generate:
+        first = get_course_plan(planned_user, 16)
+        second = get_course_plan(planned_user, 16)
+
+    assert generate.call_count == 1
+    assert first == second
+    assert [courses for _, courses in first[0]] == [["CS 149"], ["CS 240"]]
+
+
+def test_coursework_change_invalidates_plan(planned_user):
+    get_course_plan(planned_user, 16)
+    plan_key = cache.get(user_plan_key(planned_user.pk))
+
+    UserCourseFactory(user=planned_user, code="CS 149")
+
+    assert cache.get(plan_key) is None
+    assert [courses for _, courses in get_course_plan(planned_user, 16)[0]] == [["CS 240"]]
+
+
+def test_catalog_change_misses_cache(planned_user):
+    semesters, _ = get_course_plan(planned_user, 16)
+
+    CourseFactory(code="CS 327", prerequisites=[CourseFactory(code="CS 240")])
+    planned_user.curriculums.first().requirements.add(CourseFactory(code="CS 327"))
+
+    assert get_course_plan(planned_user, 16)[0] != semesters
+
+
+def test_coursework_edit_replans_stored_plan(planned_user):
+    get_course_plan(planned_user, 16)
+    stored = Plan.objects.get(user=planned_user)
+
+    UserCourseFactory(user=planned_user, code="CS 149")
+    with mock.patch.object(course_util, "generate", wraps=course_util.generate) as generate, \
+            mock.patch.object(course_util, "build_requirements") as build_requirements:
+        semesters, _ = get_course_plan(planned_user, 16)
+
+    generate.assert_not_called()
+    build_requirements.assert_not_called()
+    assert [courses for _, courses in semesters] == [["CS 240"]]
+    assert Plan.objects.get(user=planned_user).semesters == [[stored.first_term, [stored.semesters[1][1][0]]]]
+
+
+def test_stored_plan_selection_is_reused(planned_user):
+    get_course_plan(planned_user, 16)
+    catalog = get_catalog()
+    curriculums = list(planned_user.curriculums.values_list("pk", flat=True))
+
+    assert stored_requirements(planned_user, catalog, curriculums, frozenset(), 16) == set(
+        catalog.ids(["CS 149", "CS 240"]))
+    assert stored_requirements(planned_user, catalog, curriculums, frozenset(), 12) is None
+
+
+def test_unplanned_coursework_reruns_optimizer(planned_user):
+    CourseFactory(code="MATH 231")
+    get_course_plan(planned_user, 16)
+
+    UserCourseFactory(user=planned_user, code="MATH 231")
+    with mock.patch.object(course_util, "build_requirements", wraps=course_util.build_requirements) as build:
+        get_course_plan(planned_user, 16)
+
+    build.assert_called_once()
+
+
+def test_compare_plans_what_if(client, planned_user):
+    major = planned_user.curriculums.get()
+    minor = CurriculumFactory(name="Math Minor", requirements=[CourseFactory(code="MATH 231", credits=4)])
+    client.force_login(planned_user)
+    url = reverse("users:plan_compare")
+
+    with mock.patch.object(plan_cache, "generate_course_plan", wraps=plan_cache.generate_course_plan) as generate:
+        response = client.get(url, {"option": [f"{major.pk}", f"{major.pk},{minor.pk}", f"{minor.pk},{major.pk}"]})
+        assert generate.call_count == 2
+        assert generate.call_args_list[0].kwargs["memo"] is generate.call_args_list[1].kwargs["memo"]
+
+    current, with_minor = response.json()["options"]
+    assert (current["semesters"], current["credits"]) == (2, 6)
+    assert (with_minor["courses"], with_minor["credits"]) == (3, 10)
+    assert with_minor["names"][1] == "Math Minor"
+
+    # The current combination shares its cache entry with the student's own plan
+    with mock.patch.object(plan_cache, "generate_course_plan") as generate:
+        assert get_course_plan(planned_user, 16)[0][-1][0] == current["graduation"]
+        assert not generate.called
+    assert client.get(url, {"option": "999"}).status_code == 400
+
+
+def test_single_flight_waits_for_the_lock_holder():
+    cache.add("plan:test:lock", "another worker")
+    threading.Timer(0.1, cache.set, ("plan:test", "computed elsewhere")).start()
+    compute = mock.Mock(return_value="computed here")
+
+    assert single_flight("plan:test", compute, None) == "computed elsewhere"
+    assert not compute.called
+
+
+def test_single_flight_computes_once_and_releases_lock():
+    compute = mock.Mock(return_value="plan")
+
+    assert single_flight("plan:test", compute, None) == "plan"
+    assert single_flight("plan:test", compute, None) == "plan"
+    assert compute.call_count == 1
+    assert cache.get("plan:test:lock") is None
+
+
+def test_single_flight_takes_over_from_a_stalled_worker(monkeypatch):
+    monkeypatch.setattr(plan_cache, "WAIT_TIMEOUT", 0.1)
+    cache.add("plan:test:lock", "crashed worker")
+
+    assert single_flight("plan:test", lambda: "plan", None) == "plan"
+    assert cache.get("plan:test:lock") == "crashed worker"
@@ -0,0 +1,77 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from courseplanner.users.models import Requirement
+from courseplanner.users.tests.factories import CourseFactory, CourseGroupFactory, CurriculumFactory
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.optimizer import optimize_requirements
+from courseplanner.utils.requirements import CourseNode, GroupNode, curriculum_trees, requirement_tree
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def curriculum():
+    intro = CourseFactory(code="CS 149", credits=3)
+    systems = CourseFactory(code="CS 261", credits=4)
+    theory = CourseFactory(code="MATH 245", credits=3)
+    nested = CourseGroupFactory(minimum_credits=3, requirements=[theory])
+    electives = CourseGroupFactory(minimum_credits=4, requirements=[systems, nested])
+    return CurriculumFactory(requirements=[intro, electives])
+
+
+def test_tree_is_typed_and_shared(curriculum):
+    catalog = get_catalog()
+    intro, electives = curriculum_trees(curriculum.pk, catalog)
+
+    assert isinstance(intro, CourseNode) and intro.code == "CS 149"
+    assert isinstance(electives, GroupNode) and electives.minimum_credits == 4
+    assert [child.pk for child in electives.children[1].children] == [catalog.pks[catalog.index["MATH 245"]]]
+    assert requirement_tree(electives.pk, catalog) is electives
+
+
+def test_requirement_dispatch_without_queries(curriculum):
+    requirements = list(Requirement.objects.order_by('pk'))
+    get_catalog()
+
+    with CaptureQueriesContext(connection) as queries:
+        assert [requirement.get_credits() for requirement in requirements] == [3, 4, 3, 3, 4]
+        text = str(requirements[-1])
+        display = curriculum.display()
+
+    assert len(queries) == 0
+    assert text == "CourseGroup (4 credits)\n\tCS 261\n\tCourseGroup (3 credits)\n\t\tMATH 245\n"
+    assert display == "CS 149\n" + text
+
+
+def test_bare_requirements_are_skipped(admin_client, curriculum):
+    electives = curriculum.requirements.last().coursegroup
+    bare = Requirement.objects.create()
+    curriculum.requirements.add(bare)
+    electives.requirements.add(bare)
+    catalog = get_catalog()
+
+    assert [node.pk for node in curriculum_trees(curriculum.pk, catalog)] == list(catalog.curriculums[curriculum.pk])
+    assert bare.pk not in catalog.curriculums[curriculum.pk]
+    assert curriculum.display().count("\n") == 5
+    assert str(bare) == f"Requirement object ({bare.pk})"
+    assert optimize_requirements([curriculum.pk], catalog, frozenset(), time_budget=0)
+    assert admin_client.get("/admin/users/curriculum/").status_code == 200
+
+
+def test_curriculum_changelist_queries_are_constant(admin_client, curriculum):
+    url = "/admin/users/curriculum/"
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get(url)
+    baseline = len(queries)
+
+    for _ in range(5):
+        CurriculumFactory(requirements=[CourseFactory(), curriculum.requirements.last()])
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+
+    assert len(queries) == baseline
+    assert "|---CS 261<br/>" in response.content.decode()
@@ -0,0 +1,135 @@
+import datetime
+import itertools
+
+import networkx as nx
+import pytest
+
+from courseplanner.users.models import TERM_BITS
+from courseplanner.utils.course_util import plan_terms
+from courseplanner.utils.scheduler import plan_bounds, reschedule, schedule
+
+
+def chain_graph():
+    graph = nx.DiGraph()
+    for code, credits in [("CS 149", 3), ("CS 159", 3), ("CS 240", 3), ("MATH 231", 4), ("MATH 232", 4)]:
+        graph.add_node(code, credits=credits)
+    graph.add_edge("CS 149", "CS 159")
+    graph.add_edge("CS 159", "CS 240")
+    graph.add_edge("MATH 231", "MATH 232")
+    return graph
+
+
+def test_prerequisites_come_in_earlier_semesters():
+    semesters = schedule(chain_graph(), 16)
+    position = {course: index for index, (_, semester) in enumerate(semesters) for course in semester}
+
+    assert semesters == [(1, ["CS 149", "MATH 231"]), (2, ["CS 159", "MATH 232"]), (3, ["CS 240"])]
+    for before, after in chain_graph().edges:
+        assert position[before] < position[after]
+
+
+def test_honors_credit_limit():
+    graph = nx.DiGraph()
+    for index in range(6):
+        graph.add_node(index, credits=3)
+
+    semesters = schedule(graph, 6)
+
+    assert [len(semester) for _, semester in semesters] == [2, 2, 2]
+
+
+def test_oversized_course_still_placed():
+    graph = nx.DiGraph()
+    graph.add_node("THESIS", credits=20)
+    graph.add_node("CS 101", credits=3)
+
+    assert schedule(graph, 16) == [(1, ["THESIS"]), (2, ["CS 101"])]
+
+
+def test_every_course_oversized():
+    graph = nx.DiGraph()
+    graph.add_node("THESIS", credits=20)
+    graph.add_node("PRACTICUM", credits=18)
+    graph.add_edge("THESIS", "PRACTICUM")
+
+    assert schedule(graph, 16) == [(1, ["THESIS"]), (2, ["PRACTICUM"])]
+
+
+def test_only_placed_in_offered_terms():
+    graph = chain_graph()
+    graph.nodes["CS 159"]["offered"] = TERM_BITS["Spring"]
+    terms = itertools.cycle([("Spring", TERM_BITS["Spring"]), ("Fall", TERM_BITS["Fall"])])
+
+    semesters = schedule(graph, 16, terms)
+
+    assert semesters == [
+        ("Spring", ["CS 149", "MATH 231"]),
+        ("Fall", ["MATH 232"]),
+        ("Spring", ["CS 159"]),
+        ("Fall", ["CS 240"]),
+    ]
+    graph.nodes["CS 149"]["offered"] = TERM_BITS["Summer"]
+    with pytest.raises(ValueError):
+        schedule(graph, 16, terms)
+
+
+def test_plan_terms_alternate_from_next_open_term():
+    terms = plan_terms(datetime.datetime(2026, 10, 18))
+
+    assert [label for label, _ in itertools.islice(terms, 4)] == [
+        "Spring 2027", "Fall 2027", "Spring 2028", "Fall 2028",
+    ]
+    terms = plan_terms(datetime.datetime(2026, 1, 10))
+    assert [label for label, _ in itertools.islice(terms, 3)] == ["Fall 2026", "Spring 2027", "Fall 2027"]
+
+
+def test_cycle_raises():
+    graph = chain_graph()
+    graph.add_edge("CS 240", "CS 149")
+
+    with pytest.raises(nx.NetworkXUnfeasible):
+        schedule(graph, 16)
+
+
+def test_reschedule_keeps_unaffected_semesters():
+    graph = chain_graph()
+    previous = schedule(graph, 16)
+    graph.remove_node("MATH 232")
+    graph.add_node("CS 261", credits=3)
+    graph.add_edge("CS 159", "CS 261")
+
+    semesters = reschedule(graph, previous, 16)
+
+    assert semesters[0] is previous[0]
+    assert semesters == [(1, ["CS 149", "MATH 231"]), (2, ["CS 159"]), (3, ["CS 240", "CS 261"])]
+
+
+def test_reschedule_replans_from_broken_prerequisite():
+    graph = chain_graph()
+    previous = [(1, ["CS 159", "MATH 231"]), (2, ["CS 240", "MATH 232"])]
+
+    semesters = reschedule(graph, previous, 16)
+
+    assert semesters == [(1, ["CS 149", "MATH 231"]), (2, ["CS 159", "MATH 232"]), (3, ["CS 240"])]
+
+
+def test_reschedule_drops_completed_courses_in_place():
+    graph = chain_graph()
+    graph.remove_nodes_from(["CS 149", "MATH 232"])
+    previous = [(1, ["CS 149", "MATH 231"]), (2, ["CS 159"]), (3, ["CS 240"])]
+
+    semesters = reschedule(graph, previous, 16)
+
+    assert semesters == [(1, ["MATH 231"]), (2, ["CS 159"]), (3, ["CS 240"])]
+    assert semesters[1] is previous[1]
+
+
+def test_plan_bounds():
+    graph = chain_graph()
+
+    assert plan_bounds(graph, 16) == (3, 2, 3)
+    assert plan_bounds(graph, 4) == (3, 5, 5)
+    assert len(schedule(graph, 16)) == plan_bounds(graph, 16).semesters
+
+    graph.add_node("CS 497", credits=20)
+    assert plan_bounds(graph, 16).credit_semesters == 3
@@ -0,0 +1,68 @@
+import pytest
+
+from courseplanner.users.models import Course
+from courseplanner.users.tests.factories import CourseFactory, CourseGroupFactory
+from courseplanner.utils.catalog import get_catalog
+from courseplanner.utils.bitset import iter_ids, to_ids, to_mask
+from courseplanner.utils.solver import needed_courses, solve_group
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def electives():
+    intro = CourseFactory(code="CS 149")
+    data = CourseFactory(code="CS 240", prerequisites=[intro])
+    CourseFactory(code="CS 430", prerequisites=[data])
+    CourseFactory(code="CS 432", prerequisites=[intro])
+    CourseFactory(code="CS 470")
+    return CourseGroupFactory(minimum_credits=6, requirements=list(
+        Course.objects.filter(code__in=["CS 430", "CS 432", "CS 470"])
+    ))
+
+
+def codes(catalog, ids):
+    return {catalog.codes[course] for course in ids}
+
+
+def test_picks_fewest_prerequisites(electives):
+    catalog = get_catalog()
+
+    assert codes(catalog, solve_group(electives.pk, catalog)) == {"CS 432", "CS 470"}
+
+
+def test_prefers_completed_courses(electives):
+    catalog = get_catalog()
+    completed = frozenset(catalog.ids(["CS 149", "CS 240", "CS 430"]))
+
+    assert codes(catalog, solve_group(electives.pk, catalog, completed)) == {"CS 430", "CS 432"}
+
+
+def test_unsatisfiable_group_plans_everything(electives):
+    electives.minimum_credits = 12
+    electives.save()
+    catalog = get_catalog()
+
+    assert codes(catalog, solve_group(electives.pk, catalog)) == {"CS 430", "CS 432", "CS 470"}
+
+
+def test_solutions_are_memoized(electives, django_assert_num_queries):
+    catalog = get_catalog()
+    first = solve_group(electives.pk, catalog)
+
+    with django_assert_num_queries(0):
+        assert solve_group(electives.pk, catalog) is first
+    assert set(electives.get_satisfiable_subset()) == set(
+        Course.objects.filter(code__in=["CS 432", "CS 470"])
+    )
+
+
+def test_needed_courses_bitset(electives):
+    catalog = get_catalog()
+    algo = catalog.index["CS 430"]
+
+    assert codes(catalog, iter_ids(needed_courses(algo, catalog, 0, {}))) == {"CS 149", "CS 240", "CS 430"}
+
+    # Prerequisites of a completed course are no longer needed
+    completed = to_mask(catalog.ids(["CS 240"]))
+    assert codes(catalog, to_ids(needed_courses(algo, catalog, completed, {}))) == {"CS 430"}
@@ -0,0 +1,175 @@
+import hashlib
+import io
+import threading
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+
+from courseplanner.users.tests.factories import UserCourseFactory
+from courseplanner.users.tests.transcripts import pdf_document, synthetic_transcript
+from courseplanner.utils import transcripts, utils
+from courseplanner.utils.coursework import sync_user_courses
+from courseplanner.utils.transcripts import get_course_info, transcript_key
+from courseplanner.utils.utils import extract_course_info, iter_course_info
+
+
+def reader(*pages):
+    return mock.Mock(pages=[mock.Mock(**{"extract_text.return_value": text}) for text in pages])
+
+
+def test_terms_carry_across_pages():
+    pages = reader(
+        "Unofficial Transcript\nFall Semester 2023\nCS 149 Programming Fundamentals 3.000 3.000 A 12.000\n",
+        "MATH 231 Calculus 4.000 4.00B+13.200\nSpring Semester 2024\nGSCI 101 Physics 3.000 0.00W0.000\n",
+    )
+    with mock.patch.object(utils.PyPDF2, "PdfReader", return_value=pages):
+        courses = extract_course_info(None)
+
+    assert courses == [
+        (2023, "Fall", "CS 149", 3, None),
+        (2023, "Fall", "MATH 231", 4, "B+"),
+        (2024, "Spring", "GSCI 101", 3, "W"),
+    ]
+
+
+def test_stops_at_end_of_transcript():
+    pages = reader(
+        "Fall Semester 2023\nCS 149 Intro 3.000 3.000A12.000\nEnd of Unofficial Transcript\nCS 999 Notes 3.000",
+        "CS 240 Data 3.000 3.000A12.000",
+    )
+    with mock.patch.object(utils.PyPDF2, "PdfReader", return_value=pages):
+        courses = iter_course_info(None)
+        assert next(courses)[2] == "CS 149"
+        assert list(courses) == []
+
+    pages.pages[1].extract_text.assert_not_called()
+
+
+@pytest.mark.parametrize("pages,terms,courses", [(1, 1, 3), (3, 8, 40), (12, 12, 60), (2, 4, 200)])
+def test_synthetic_transcripts_parse_exactly(pages, terms, courses):
+    document, expected = synthetic_transcript(pages, terms, courses)
+
+    assert extract_course_info(io.BytesIO(document)) == expected
+
+
+def test_parallel_extraction_carries_terms_across_workers(settings):
+    settings.TRANSCRIPT_WORKERS = 3
+    settings.TRANSCRIPT_PARALLEL_MIN_PAGES = 2
+    document, expected = synthetic_transcript(pages=10, terms=4, courses=60)
+
+    with mock.patch.object(utils, "page_entries", wraps=utils.page_entries) as serial:
+        assert extract_course_info(io.BytesIO(document)) == expected
+    serial.assert_not_called()
+
+
+def test_parallel_extraction_stops_at_end_of_transcript(settings):
+    settings.TRANSCRIPT_WORKERS = 2
+    settings.TRANSCRIPT_PARALLEL_MIN_PAGES = 2
+    document = pdf_document(
+        [["Fall Semester 2023", "CS 149 Intro 3.000 3.00A12.000"], ["End of Unofficial Transcript"]]
+        + [["CS 999 Notes 3.000 3.00A12.000"]] * 6
+    )
+
+    assert extract_course_info(io.BytesIO(document)) == [(2023, "Fall", "CS 149", 3, "A")]
+
+
+def test_short_transcripts_extract_serially(settings):
+    settings.TRANSCRIPT_WORKERS = 3
+    settings.TRANSCRIPT_PARALLEL_MIN_PAGES = 4
+    document, expected = synthetic_transcript(pages=3, terms=2, courses=12)
+
+    with mock.patch.object(utils, "get_transcript_pool") as get_transcript_pool:
+        assert extract_course_info(io.BytesIO(document)) == expected
+    get_transcript_pool.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_sync_user_courses_writes_only_the_difference(user, django_assert_num_queries):
+    kept = UserCourseFactory(user=user, year=2023, semester="Fall", code="CS 149", credits=3, grade="A")
+    regraded = UserCourseFactory(user=user, year=2023, semester="Fall", code="CS 159", credits=3, grade="I")
+    dropped = UserCourseFactory(user=user, year=2023, semester="Fall", code="CS 227", credits=3, grade="A")
+    manual = UserCourseFactory(user=user, year=2025, semester="Spring", code="CS 345", credits=3, grade=None)
+    courses = [
+        (2023, "Fall", "CS 149", 3, "A"),
+        (2023, "Fall", "CS 159", 3, "B"),
+        (2024, "Spring", "CS 240", 3, "A-"),
+    ]
+
+    assert sync_user_courses(user, courses) == (1, 1, 1)
+
+    rows = {(course.year, course.semester, course.code): course for course in user.courses.all()}
+    assert set(rows) == {(2023, "Fall", "CS 149"), (2023, "Fall", "CS 159"), (2024, "Spring", "CS 240"),
+                         (2025, "Spring", "CS 345")}
+    assert rows[(2023, "Fall", "CS 149")].pk == kept.pk
+    assert rows[(2023, "Fall", "CS 159")].grade == "B" and rows[(2023, "Fall", "CS 159")].pk == regraded.pk
+    assert rows[(2025, "Spring", "CS 345")].pk == manual.pk
+    assert not user.courses.filter(pk=dropped.pk).exists()
+
+    # Re-uploading the same transcript reads the coursework and writes nothing
+    with django_assert_num_queries(1):
+        assert sync_user_courses(user, courses) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+def test_sync_user_courses_keeps_manual_courses_without_a_term(user):
+    manual = UserCourseFactory(user=user, year=None, semester=None, code="CS 101", credits=3, grade="A")
+
+    assert sync_user_courses(user, [(None, None, "CS 149", 3, "A")]) == (1, 0, 0)
+    assert user.courses.filter(pk=manual.pk).exists()
+
+
+@pytest.fixture
+def parse():
+    courses = [(2023, "Fall", "CS 149", 3, "A")]
+    with mock.patch.object(transcripts, "extract_course_info", return_value=courses) as parse:
+        yield parse
+
+
+def test_repeat_transcripts_skip_parsing(parse):
+    assert get_course_info(SimpleUploadedFile("a.pdf", b"%PDF one")) == [(2023, "Fall", "CS 149", 3, "A")]
+    assert get_course_info(SimpleUploadedFile("b.pdf", b"%PDF one")) == [(2023, "Fall", "CS 149", 3, "A")]
+    assert parse.call_count == 1
+
+    with mock.patch.object(transcripts, "transcript_key", lambda digest: f"transcript:v0:{digest}"):
+        get_course_info(SimpleUploadedFile("a.pdf", b"%PDF one"))
+    assert parse.call_count == 2
+
+
+def test_transcript_cache_evicts_oldest(parse, settings):
+    settings.TRANSCRIPT_CACHE_MAX_ENTRIES = 2
+    for content in (b"one", b"two", b"one", b"three"):
+        get_course_info(SimpleUploadedFile("t.pdf", content))
+
+    assert cache.get(transcript_key(hashlib.sha256(b"one").hexdigest())) is None
+    assert cache.get(transcript_key(hashlib.sha256(b"two").hexdigest())) is not None
+    assert len(cache.get(transcripts.TRANSCRIPT_INDEX_KEY)) == 2
+
+
+def test_concurrent_transcripts_keep_the_index(parse):
+    threads = [threading.Thread(target=get_course_info, args=(SimpleUploadedFile("t.pdf", b"%d" % number),))
+               for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(cache.get(transcripts.TRANSCRIPT_INDEX_KEY)) == 8
+
+
+@pytest.mark.django_db
+def test_upload_is_hashed_while_streaming(client, user, parse):
+    client.force_login(user)
+    content = b"%PDF transcript"
+
+    with mock.patch.object(transcripts, "file_digest") as file_digest:
+        client.post(reverse("users:update"), {
+            "transcript": SimpleUploadedFile("t.pdf", content, content_type="application/pdf"),
+            "transcript_upload_submit": "",
+        })
+    assert not file_digest.called
+
+    assert cache.get(transcript_key(hashlib.sha256(content).hexdigest())) == parse.return_value
+    assert user.courses.get().code == "CS 149"
@@ -0,0 +1,88 @@
+"""
+Synthetic transcript PDFs with known contents, for parser tests and
+benchmarks/bench_transcripts.py. The PDFs are written by hand (one
+Helvetica text block per page) so no PDF library is needed to make them.
+"""
+import random
+
+from courseplanner.users.models import Grade
+
+SUBJECTS = ['CS', 'MATH', 'GSCI', 'WRTC', 'PHIL', 'HIST', 'ISAT', 'ECON']
+NAMES = ['Intro Programming', 'Data Structures', 'Calculus I', 'Ethics', 'Physics', 'Writing', 'Statistics']
+
+# Default share of each grade; None is an in-progress course with no grade yet
+GRADE_MIX = {
+    Grade.A: 30, Grade.A_MINUS: 12, Grade.B_PLUS: 12, Grade.B: 12, Grade.B_MINUS: 6, Grade.C_PLUS: 5,
+    Grade.C: 5, Grade.D: 2, Grade.F: 2, Grade.PASS: 3, Grade.WITHDRAW: 3, Grade.CREDIT: 3, None: 5,
+}
+
+"""
+Builds a transcript and the courses a correct parser must find in it.
+
+Args:
+    pages: Number of pages; lines are spread evenly and short transcripts are padded with GPA lines
+    terms: Number of terms, alternating Spring, Summer and Fall from Fall 2020
+    courses: Total number of courses, spread evenly over the terms
+    grade_mix: Grade -> relative weight, see GRADE_MIX
+
+Returns:
+    (bytes, list): The PDF, and its (year, term, code, credits, grade) tuples in transcript order
+"""
+def synthetic_transcript(pages=2, terms=8, courses=40, grade_mix=None, seed=0):
+    rng = random.Random(seed)
+    grade_mix = grade_mix or GRADE_MIX
+    grades, weights = list(grade_mix), list(grade_mix.values())
+
+    lines = []
+    expected = []
+    year, season = 2020, 2
+    for term in range(terms):
+        name = ('Spring', 'Summer', 'Fall')[season]
+        lines.append(f"{name} {'Session' if name == 'Summer' else 'Semester'} {year}")
+        for _ in range(courses // terms + (term < courses % terms)):
+            code = f"{rng.choice(SUBJECTS)} {rng.randint(100, 499)}"
+            credits = rng.choice((1, 3, 3, 3, 4))
+            grade = rng.choices(grades, weights)[0]
+            earned = 0 if grade in (Grade.F, Grade.WITHDRAW, None) else credits
+            lines.append(f"{code} {rng.choice(NAMES)} {credits:.3f} {earned:.2f}{grade or ''}{earned * 3:.3f}")
+            expected.append((year, name, code, credits, str(grade) if grade else None))
+        lines.append(f"Term GPA {rng.uniform(2, 4):.3f} Term Totals {rng.randint(6, 18):.3f}")
+        season = (season + 1) % 3
+        year += season == 0
+    lines.append("End of Unofficial Transcript")
+
+    per_page = max(1, -(-len(lines) // pages))
+    page_lines = [["Unofficial Transcript"] + lines[start:start + per_page]
+                  for start in range(0, per_page * pages, per_page)]
+    for page in page_lines:
+        while len(page) < per_page:
+            page.append(f"Cumulative GPA {rng.uniform(2, 4):.3f}")
+    return pdf_document(page_lines), expected
+
+def pdf_document(pages):
+    objects = [b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>', None]
+    kids = []
+    for lines in pages:
+        text = ' '.join(f'({escape(line)}) Tj T*' for line in lines)
+        stream = f'BT /F1 9 Tf 11 TL 40 760 Td {text} ET'.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R '
+                        '/Resources << /Font << /F1 1 0 R >> >> >>' % len(objects)).encode())
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+    objects.append(b'<< /Type /Catalog /Pages 2 0 R >>')
+
+    document = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(document))
+        document += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(document)
+    document += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    document += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    document += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+        len(objects) + 1, len(objects), xref)
+    return bytes(document)
+
+def escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
@@ -6,9 +6,10 @@ from courseplanner.users.views import (
     user_update_view,
     user_detail_view,
     user_plan_view,
+    plan_graph_image,
+    plan_graph_json,
+    plan_compare_json,
     autocomplete_course_codes,
-    generate_course_plan,
-
 )
 
 app_name = "users"
@@ -16,6 +17,9 @@ urlpatterns = [
     path("~redirect/", view=user_redirect_view, name="redirect"),
     path("~update/", view=user_update_view, name="update"),
     path("plan/", view=user_plan_view, name="plan"),
+    path("plan/graph.json", view=plan_graph_json, name="plan_graph_json"),
+    path("plan/compare.json", view=plan_compare_json, name="plan_compare"),
+    path("plan/graph/<slug:digest>.png", view=plan_graph_image, name="plan_graph"),
     path("<str:username>/", view=user_detail_view, name="detail"),
     path("autocomplete_course_codes/", autocomplete_course_codes, name='autocomplete_course_codes'),
 ]
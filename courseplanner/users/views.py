@@ -1,7 +1,10 @@
 from typing import Any
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import JsonResponse
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils.cache import patch_cache_control
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.views.generic import (
@@ -17,14 +20,27 @@ from .forms import (
 from .models import (
     UserCourse,
     Course,
+    Curriculum,
 )
-from ..utils.utils import extract_course_info
-from ..utils.course_util import generate_course_plan
+from ..utils.audit import audit_curriculums, audit_rows
+from ..utils.catalog import get_catalog
+from ..utils.course_util import completed_courses, estimate_graduation
+from ..utils.coursework import sync_user_courses
+from ..utils.plans import stored_requirements
+from ..utils.transcripts import get_course_info
+from ..utils.plan_cache import compare_course_plans, get_course_plan
+from ..utils.graph_image import graph_image_name, schedule_graph_image
 
 from django.contrib import messages
 
 User = get_user_model()
 
+# Semester credit limit used when generating plans
+DEFAULT_CREDIT_LIMIT = 16
+
+# Most candidate curriculum combinations planned in one what-if comparison
+MAX_WHAT_IF_OPTIONS = 8
+
 
 class UserDetailView(LoginRequiredMixin, DetailView):
     model = User
@@ -37,8 +53,27 @@ class UserDetailView(LoginRequiredMixin, DetailView):
         context = super().get_context_data(**kwargs)
         user_courses = UserCourse.objects.filter(user=self.request.user)
         context['user_courses'] = user_courses
+
+        # The audit and estimate are only shown on the student's own page
+        user = self.request.user
+        if self.object != user:
+            return context
+        catalog = get_catalog()
+        completed = completed_courses(user, catalog)
+        curriculums = {curriculum.pk: curriculum for curriculum in user.curriculums.all()}
+        context['audits'] = self.get_audits(curriculums, catalog, completed)
+        context['graduation'] = estimate_graduation(
+            list(curriculums), DEFAULT_CREDIT_LIMIT, completed, catalog,
+            expected=(user.expected_grad_term, user.expected_grad_year),
+            requirements=stored_requirements(user, catalog, list(curriculums), completed, DEFAULT_CREDIT_LIMIT),
+        )
         return context
 
+    # Degree audit of the student's passed coursework against each of their curriculums
+    def get_audits(self, curriculums, catalog, completed):
+        audits = audit_curriculums(list(curriculums), catalog, completed)
+        return [(curriculums[audit.pk], audit, audit_rows(audit.requirements)) for audit in audits]
+
 user_detail_view = UserDetailView.as_view()
 
 class UserUpdateView(LoginRequiredMixin, TemplateView):
@@ -60,11 +95,9 @@ class UserUpdateView(LoginRequiredMixin, TemplateView):
         if "transcript_upload_submit" in request.POST:
             if transcript_form.is_valid():
                 uploaded_file = transcript_form.cleaned_data['transcript']
-                courses = extract_course_info(uploaded_file)
-                UserCourse.objects.filter(user=user).delete()
-                for course in courses:
-                    UserCourse.objects.create(user=user, year=course[0], semester=course[1], code=course[2], credits=course[3], grade=course[4])
-                messages.success(request, uploaded_file)
+                digest = getattr(request, 'upload_digests', {}).get('transcript')
+                created, updated, deleted = sync_user_courses(user, get_course_info(uploaded_file, digest))
+                messages.success(request, f"{uploaded_file}: {created} added, {updated} updated, {deleted} removed.")
 
         if "course_input_submit" in request.POST:
             if course_form.is_valid():
@@ -127,11 +160,53 @@ class UserPlanView(LoginRequiredMixin, TemplateView):
     
     def post(self, request, *args, **kwargs):
         user = self.request.user
-        semesters, graph = generate_course_plan(user.curriculums.all(), 16)
+        semesters, graph = get_course_plan(user, DEFAULT_CREDIT_LIMIT)
         return render(request, self.template_name, {'semesters': semesters, 'graph': graph})
 
 user_plan_view = UserPlanView.as_view()
 
+# Nodes and edges of the user's plan graph, drawn client side on the plan page.
+@login_required
+def plan_graph_json(request):
+    _, graph = get_course_plan(request.user, DEFAULT_CREDIT_LIMIT)
+    return JsonResponse(graph)
+
+# What-if comparison of candidate curriculum combinations, e.g. ?option=1,2&option=1,2,5
+@login_required
+def plan_compare_json(request):
+    try:
+        options = [{int(pk) for pk in option.split(',') if pk} for option in request.GET.getlist('option')]
+    except ValueError:
+        return JsonResponse({'error': "Options must be comma separated curriculum ids."}, status=400)
+    if not options or len(options) > MAX_WHAT_IF_OPTIONS:
+        return JsonResponse({'error': f"Compare between 1 and {MAX_WHAT_IF_OPTIONS} options."}, status=400)
+
+    names = dict(Curriculum.objects.filter(pk__in=set().union(*options)).values_list('pk', 'name'))
+    unknown = set().union(*options) - set(names)
+    if unknown:
+        return JsonResponse({'error': f"Unknown curriculums: {sorted(unknown)}"}, status=400)
+
+    comparison = compare_course_plans(request.user, options, DEFAULT_CREDIT_LIMIT)
+    for option in comparison:
+        option['names'] = [names[pk] for pk in option['curriculums']]
+    return JsonResponse({'options': comparison})
+
+# Serves a plan graph's image by content hash, asking the client to retry while it is still rendering.
+@login_required
+def plan_graph_image(request, digest):
+    name = graph_image_name(digest)
+    if default_storage.exists(name):
+        response = FileResponse(default_storage.open(name), content_type='image/png')
+        patch_cache_control(response, private=True, max_age=60 * 60 * 24 * 365, immutable=True)
+        return response
+
+    if not schedule_graph_image(digest):
+        raise Http404("Unknown plan graph.")
+    response = HttpResponse(status=202)
+    response['Retry-After'] = '1'
+    patch_cache_control(response, no_store=True)
+    return response
+
 class UserRedirectView(LoginRequiredMixin, RedirectView):
     permanent = False
 
@@ -0,0 +1,81 @@
+from collections import namedtuple
+
+from .requirements import CourseNode, curriculum_trees
+
+SATISFIED = 'satisfied'
+PARTIAL = 'partial'
+REMAINING = 'remaining'
+
+# Audit of one requirement tree node; `children` holds the audits of a CourseGroup's members
+RequirementAudit = namedtuple('RequirementAudit', ['node', 'status', 'earned', 'required', 'children'])
+
+# Audit of a whole curriculum; credits are totals over its top level requirements
+CurriculumAudit = namedtuple('CurriculumAudit', ['pk', 'status', 'earned', 'required', 'requirements'])
+
+"""
+Degree audit of a student's completed coursework against their curriculums.
+
+Walks the in-memory requirement trees of the catalog snapshot, checking
+course membership against the set of completed catalog ids, so a full
+audit never queries the database. Satisfaction follows the planner: a
+CourseGroup is satisfied once the credits of its satisfied members meet
+its minimum. A requirement with some progress short of that is partial.
+Subtrees shared between curriculums are only evaluated once.
+
+Args:
+    curriculum_pks: Pks of the curriculums to audit
+    catalog: The catalog snapshot `completed` was resolved against
+    completed (set): Catalog ids of completed courses, see completed_courses
+
+Returns:
+    [CurriculumAudit]: One per curriculum, in the order given
+"""
+def audit_curriculums(curriculum_pks, catalog, completed):
+    memo = {}
+    audits = []
+    for curriculum in curriculum_pks:
+        requirements = [audit_requirement(node, completed, memo) for node in curriculum_trees(curriculum, catalog)]
+        earned = sum(requirement.earned for requirement in requirements)
+        required = sum(requirement.required for requirement in requirements)
+        audits.append(CurriculumAudit(curriculum, combined_status(requirements), earned, required, requirements))
+    return audits
+
+def audit_requirement(node, completed, memo):
+    if node.pk in memo:
+        return memo[node.pk]
+
+    if isinstance(node, CourseNode):
+        earned = node.credits if node.course in completed else 0
+        status = SATISFIED if earned else REMAINING
+        memo[node.pk] = RequirementAudit(node, status, earned, node.credits, ())
+        return memo[node.pk]
+
+    children = tuple(audit_requirement(child, completed, memo) for child in node.children)
+    earned = min(node.minimum_credits, sum(child.required for child in children if child.status == SATISFIED))
+    if earned >= node.minimum_credits:
+        status = SATISFIED
+    elif earned or any(child.status == PARTIAL for child in children):
+        status = PARTIAL
+    else:
+        status = REMAINING
+    memo[node.pk] = RequirementAudit(node, status, earned, node.minimum_credits, children)
+    return memo[node.pk]
+
+def combined_status(requirements):
+    statuses = {requirement.status for requirement in requirements}
+    if statuses <= {SATISFIED}:
+        return SATISFIED
+    if statuses == {REMAINING}:
+        return REMAINING
+    return PARTIAL
+
+"""
+Flattens requirement audits into (depth, audit) rows in display order,
+for rendering a tree as a table.
+"""
+def audit_rows(requirements, depth=0):
+    rows = []
+    for requirement in requirements:
+        rows.append((depth, requirement))
+        rows.extend(audit_rows(requirement.children, depth + 1))
+    return rows
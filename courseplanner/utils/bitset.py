@@ -0,0 +1,31 @@
+"""
+Course sets as bitsets: a Python int with bit `i` set for catalog id `i`.
+
+Union, intersection and difference of whole sets are single int
+operations, and "every prerequisite is met" is `requisites & ~met == 0`.
+"""
+
+def to_mask(ids):
+    mask = 0
+    for course in ids:
+        mask |= 1 << course
+    return mask
+
+"""
+Yields the catalog ids in a mask, lowest first, in time proportional to
+the number of set bits rather than the catalog size.
+"""
+def iter_ids(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def to_ids(mask):
+    return frozenset(iter_ids(mask))
+
+def mask_credits(mask, catalog):
+    return sum(catalog.credits[course] for course in iter_ids(mask))
+
+def count(mask):
+    return bin(mask).count('1')
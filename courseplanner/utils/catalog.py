@@ -0,0 +1,145 @@
+import threading
+import uuid
+
+from django.core.cache import cache
+
+from .bitset import to_mask
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+"""
+A read-only, integer-indexed snapshot of the course catalog.
+
+Every course is given a dense id (its position in `codes`), and all
+per-course data is stored in lists indexed by that id. Prerequisite and
+corequisite edges are stored as tuples of ids and offered terms as
+bitmasks, so walking the catalog never touches the ORM once the
+snapshot has been loaded.
+"""
+class Catalog:
+
+    def __init__(self, version, courses, prerequisites, corequisites, offered,
+                 groups=(), group_members=(), curriculums=(), closure=()):
+        self.version = version
+        self.pks = []
+        self.codes = []
+        self.credits = []
+        self.index = {}     # course code -> id
+        self.pk_index = {}  # Course pk -> id
+
+        for pk, code, credits in courses:
+            self.pk_index[pk] = len(self.codes)
+            self.index[code] = len(self.codes)
+            self.pks.append(pk)
+            self.codes.append(code)
+            self.credits.append(credits)
+
+        self.prerequisites = self._group_edges(prerequisites)
+        self.corequisites = self._group_edges(corequisites)
+        # Bitset of each course's prerequisites and corequisites, see utils.bitset
+        self.requisites = [to_mask(pre + co) for pre, co in zip(self.prerequisites, self.corequisites)]
+
+        # Bitset of each course's transitive requisites, from the PrerequisiteClosure table
+        self.closure = [0] * len(self.codes)
+        for course_pk, prerequisite_pk in closure:
+            self.closure[self.pk_index[course_pk]] |= 1 << self.pk_index[prerequisite_pk]
+
+        # Bitmask of TERM_BITS per course; 0 means no offering has been recorded
+        self.offered = [0] * len(self.codes)
+        for course_pk, term_bit in offered:
+            self.offered[self.pk_index[course_pk]] |= term_bit
+
+        # Requirement pks are either a Course pk (see pk_index) or a CourseGroup pk (see groups).
+        # Bare Requirement rows, with neither child, can't be planned or displayed and are left out.
+        groups = list(groups)
+        known = set(self.pk_index) | {pk for pk, _ in groups}
+        members = {}
+        for group_pk, requirement_pk in sorted(group_members):
+            if requirement_pk in known:
+                members.setdefault(group_pk, []).append(requirement_pk)
+        self.groups = {pk: (minimum, tuple(members.get(pk, ()))) for pk, minimum in groups}
+
+        # Curriculum pk -> pks of its top level requirements
+        roots = {}
+        for curriculum_pk, requirement_pk in sorted(curriculums):
+            roots.setdefault(curriculum_pk, [])
+            if requirement_pk in known:
+                roots[curriculum_pk].append(requirement_pk)
+        self.curriculums = {pk: tuple(requirements) for pk, requirements in roots.items()}
+
+        # Requirement pk -> typed tree node, filled in lazily by utils.requirements
+        self.requirement_nodes = {}
+        # Curriculum pk -> rendered outline of its requirement trees
+        self.curriculum_outlines = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    # Converts (course pk, other pk) rows into a tuple of ids per course
+    def _group_edges(self, edges):
+        grouped = [[] for _ in self.codes]
+        for course_pk, other_pk in edges:
+            grouped[self.pk_index[course_pk]].append(self.pk_index[other_pk])
+        return [tuple(ids) for ids in grouped]
+
+    def ids(self, codes):
+        return {self.index[code] for code in codes if code in self.index}
+
+"""
+Loads the whole catalog in a fixed number of bulk queries,
+independent of the number of courses or edges.
+"""
+def load_catalog(version=None):
+    from ..users.models import Course, CourseGroup, Curriculum, PrerequisiteClosure, TERM_BITS
+
+    if version is None:
+        version = get_catalog_version()
+
+    courses = Course.objects.order_by('code').values_list('pk', 'code', 'credits')
+    prerequisites = Course.prerequisites.through.objects.values_list('from_course_id', 'to_course_id')
+    corequisites = Course.corequisites.through.objects.values_list('from_course_id', 'to_course_id')
+    offered = Course.offered.through.objects.values_list('course_id', 'courseterm__name')
+    groups = CourseGroup.objects.values_list('pk', 'minimum_credits')
+    group_members = CourseGroup.requirements.through.objects.values_list('coursegroup_id', 'requirement_id')
+    curriculums = Curriculum.requirements.through.objects.values_list('curriculum_id', 'requirement_id')
+    closure = PrerequisiteClosure.objects.values_list('course_id', 'prerequisite_id')
+
+    offered = [(course_pk, TERM_BITS[name]) for course_pk, name in offered]
+
+    return Catalog(version, list(courses), list(prerequisites), list(corequisites), offered,
+                   list(groups), list(group_members), list(curriculums), list(closure))
+
+"""
+The catalog version lives in the cache backend so that every worker
+process agrees on it. It is an opaque random token, compared only for
+equality, and every bump draws a new one, so a cache flush or eviction
+can't bring back a version that snapshots or stored plans already carry.
+"""
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+def bump_catalog_version():
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+"""
+Returns the per-process catalog snapshot, reloading it only when the
+catalog version has moved on since it was loaded.
+"""
+def get_catalog():
+    global _snapshot
+    version = get_catalog_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = load_catalog(version)
+        return _snapshot
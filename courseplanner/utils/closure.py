@@ -0,0 +1,190 @@
+from collections import deque
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+"""
+Maintenance of the PrerequisiteClosure table: one row per course and
+each of its transitive prerequisites and corequisites, with the fewest
+requisite links between them.
+
+When a course's requisites change, only that course and the courses
+that already list it in their closure can be affected, so only their
+rows are recomputed. The closure table itself finds those dependents.
+Walks from them only follow the requisite edges of affected courses: an
+unaffected course they reach keeps its closure, so its stored rows are
+reused instead of walking on. The work is bounded by the affected part
+of the catalog, not by the whole requisite table.
+"""
+def refresh_closure(course_pks):
+    from ..users.models import PrerequisiteClosure
+
+    course_pks = set(course_pks)
+    if not course_pks:
+        return
+    affected = course_pks | set(
+        PrerequisiteClosure.objects.filter(prerequisite__in=course_pks).values_list('course_id', flat=True)
+    )
+    requisites = load_requisites(affected)
+
+    # Unaffected courses the walks step onto, with their stored closures
+    reached = {requisite for course in requisites.values() for requisite in course} - affected
+    stored = {}
+    rows = PrerequisiteClosure.objects.filter(course__in=reached).values_list('course_id', 'prerequisite_id', 'depth')
+    for course, prerequisite, depth in rows:
+        stored.setdefault(course, []).append((prerequisite, depth))
+
+    rows = []
+    for course in affected:
+        for prerequisite, depth in closure_of(course, requisites, stored).items():
+            rows.append(PrerequisiteClosure(course_id=course, prerequisite_id=prerequisite, depth=depth))
+
+    with transaction.atomic():
+        PrerequisiteClosure.objects.filter(course__in=affected).delete()
+        PrerequisiteClosure.objects.bulk_create(rows, batch_size=1000)
+
+def rebuild_closure():
+    from ..users.models import Course, PrerequisiteClosure
+
+    with transaction.atomic():
+        PrerequisiteClosure.objects.all().delete()
+        refresh_closure(Course.objects.values_list('pk', flat=True))
+
+"""
+Args:
+    course_pks: Only load the requisites of these courses, defaults to all of them
+
+Returns:
+    dict: Course pk -> pks of its direct prerequisites and corequisites
+"""
+def load_requisites(course_pks=None):
+    from ..users.models import Course
+
+    requisites = {}
+    for through in (Course.prerequisites.through, Course.corequisites.through):
+        edges = through.objects.all()
+        if course_pks is not None:
+            edges = edges.filter(from_course_id__in=course_pks)
+        for course, requisite in edges.values_list('from_course_id', 'to_course_id'):
+            requisites.setdefault(course, []).append(requisite)
+    return requisites
+
+"""
+Breadth-first walk from a course over its requisites.
+A course on a requisite cycle appears in its own closure.
+
+Args:
+    closures: Course pk -> [(requisite pk, depth)] of courses whose closure is
+              already known; the walk doesn't go past them but adds these rows
+
+Returns:
+    dict: Requisite pk -> fewest links from the course
+"""
+def closure_of(course, requisites, closures=None):
+    depths = {}
+    pending = deque((requisite, 1) for requisite in requisites.get(course, ()))
+    while pending:
+        requisite, depth = pending.popleft()
+        if requisite in depths:
+            continue
+        depths[requisite] = depth
+        pending.extend((other, depth + 1) for other in requisites.get(requisite, ()))
+
+    for known in [known for known in depths if known in (closures or ())]:
+        for requisite, depth in closures[known]:
+            depth += depths[known]
+            if depths.get(requisite, depth) >= depth:
+                depths[requisite] = depth
+    return depths
+
+"""
+Incremental cycle check for new requisite edges, run before they are
+written. Making each of `requisite_pks` a requisite of `course_pk`
+closes a cycle exactly when one of them is the course itself or already
+has the course in its closure, a single indexed query.
+
+Returns:
+    list: Course pks along the offending cycle, starting and ending at
+          the course, or None if the edges are safe to add
+"""
+def requisite_cycle(course_pk, requisite_pks):
+    from ..users.models import PrerequisiteClosure
+
+    requisite_pks = set(requisite_pks)
+    if course_pk in requisite_pks:
+        return [course_pk, course_pk]
+    requisite = (PrerequisiteClosure.objects.filter(course__in=requisite_pks, prerequisite=course_pk)
+                 .order_by('depth').values_list('course_id', flat=True).first())
+    if requisite is None:
+        return None
+    return [course_pk] + requisite_path(requisite, course_pk, load_requisites())
+
+# Shortest requisite path from one course to another, both included
+def requisite_path(start, end, requisites):
+    previous = {start: None}
+    pending = deque([start])
+    while pending:
+        course = pending.popleft()
+        if course == end:
+            break
+        for requisite in requisites.get(course, ()):
+            if requisite not in previous:
+                previous[requisite] = course
+                pending.append(requisite)
+
+    path = []
+    course = end
+    while course is not None:
+        path.append(course)
+        course = previous[course]
+    return path[::-1]
+
+"""
+Raises ValidationError naming the offending path if the new requisite
+edges would make a course, directly or transitively, require itself.
+"""
+def check_requisites(course_pk, requisite_pks):
+    from ..users.models import Course
+
+    cycle = requisite_cycle(course_pk, requisite_pks)
+    if cycle is None:
+        return
+    codes = dict(Course.objects.filter(pk__in=cycle).values_list('pk', 'code'))
+    raise ValidationError(
+        "Prerequisite cycle: %(path)s",
+        code='requisite_cycle',
+        params={'path': ' requires '.join(codes[course] for course in cycle)},
+    )
+
+"""
+Finds every requisite cycle in a whole catalog with one iterative
+depth-first search, in O(V + E). Each back edge met by the search is
+reported as the cycle it closes.
+
+Args:
+    requisites: Course pk -> pks of its direct requisites, see load_requisites
+
+Yields:
+    list: Course pks along a cycle, starting and ending at the same course
+"""
+def find_cycles(requisites):
+    done = set()
+    position = {}  # course on the current search path -> its index in `path`
+    for root in sorted(requisites):
+        if root in done:
+            continue
+        position[root] = 0
+        path = [root]
+        stack = [iter(requisites.get(root, ()))]
+        while stack:
+            requisite = next(stack[-1], None)
+            if requisite is None:
+                done.add(path[-1])
+                del position[path.pop()]
+                stack.pop()
+            elif requisite in position:
+                yield path[position[requisite]:] + [requisite]
+            elif requisite not in done:
+                position[requisite] = len(path)
+                path.append(requisite)
+                stack.append(iter(requisites.get(requisite, ())))
@@ -1,167 +1,213 @@
 import datetime
+import itertools
+from collections import namedtuple
+
 import networkx as nx
-import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
+from .bitset import iter_ids, to_mask
+from .catalog import get_catalog
+from .graph_image import graph_payload, remember_graph
+from .scheduler import plan_bounds, reschedule, schedule
+from .optimizer import optimize_requirements
+from ..users.models import Term, TERM_BITS, PASSING_GRADES, UserCourse
+
+# Terms a plan is laid out over
+PLANNED_TERMS = TERM_BITS[Term.FALL] | TERM_BITS[Term.SPRING]
+
+# Order of the terms within a calendar year
+CALENDAR_ORDER = {Term.WINTER: 0, Term.SPRING: 1, Term.SUMMER: 2, Term.FALL: 3}
+
+# Earliest final term a student could reach; `on_track` is None when no expected graduation is set
+GraduationEstimate = namedtuple('GraduationEstimate', ['bounds', 'term', 'year', 'on_track'])
 
 """
 Args:
-    curriculums (list): Collection of curriculums that need to be satisfied
-    satisfied (list): Collection of courses that have been satisfied
+    curriculums (list): Pks of the curriculums that need to be satisfied
     credit_limit: A semester must not surpass this limit
+    satisfied (set): Catalog ids of courses that have been satisfied, see completed_courses
+    catalog: The snapshot `satisfied` was resolved against, defaults to the current one
+    previous: Semesters of an earlier plan over the same terms to re-plan incrementally
+    memo: Expanded requirements shared between plans with the same satisfied courses, see optimize_requirements
+    requirements: Catalog ids of courses still to take, reused from an earlier plan instead of optimizing again
 
 Returns:
-    semesters: A list of semesters that satisfy the curriculums
+    semesters: A list of (term, courses) semesters that satisfy the curriculums
+    visualization: Compact graph payload for drawing on the client, see graph_payload
 """
-def generate_course_plan(curriculums, credit_limit):
+def generate_course_plan(curriculums, credit_limit, satisfied=frozenset(), catalog=None, previous=None, memo=None,
+                         requirements=None):
+
+    if catalog is None:
+        catalog = get_catalog()
+    if requirements is None:
+        requirements = build_requirements(curriculums, catalog, satisfied, memo)
+    graph = build_graph(requirements, catalog, satisfied)
+
+    if previous is None:
+        semesters = generate(graph, credit_limit)
+    else:
+        semesters = reschedule(graph, previous, credit_limit, plan_terms())
+        # A kept prefix can leave the plan longer than a fresh one. Only re-plan from scratch if it isn't at the bound.
+        if len(semesters) > plan_bounds(graph, credit_limit).semesters:
+            fresh = generate(graph, credit_limit)
+            if len(fresh) < len(semesters):
+                semesters = fresh
+    visualization = graph_payload(graph, semesters, remember_graph(graph))
 
-    requirements = build_requirements(curriculums)
-    graph = build_graph(requirements)
-    topological_courses = list(nx.topological_sort(graph))
+    return semesters, visualization
 
-    semesters = generate(graph, topological_courses)
-    visualization = generate_image(graph)
+"""
+Feasibility answer for advisors: the earliest term a student could
+finish, from the lower bounds of their planning graph, without
+scheduling a plan. The bounds are taken over the same requirement
+selection a plan uses, so no plan for these inputs can finish sooner.
 
-    semesters = zip_with_terms(semesters)
-    print(semesters)
+Args:
+    expected: (term, year) the student expects to graduate in, if known
+    requirements: Catalog ids of courses still to take, e.g. a stored plan's (see plans.stored_requirements);
+                  chosen by the optimizer when not given
 
-    return semesters, visualization
+Returns:
+    GraduationEstimate: `term` and `year` are None when nothing remains
+"""
+def estimate_graduation(curriculums, credit_limit, satisfied=frozenset(), catalog=None, expected=None, now=None,
+                        requirements=None):
+    if catalog is None:
+        catalog = get_catalog()
+    if requirements is None:
+        requirements = build_requirements(curriculums, catalog, satisfied)
+    bounds = plan_bounds(build_graph(requirements, catalog, satisfied), credit_limit)
+
+    term = year = None
+    if bounds.semesters:
+        label, _ = next(itertools.islice(plan_terms(now), bounds.semesters - 1, None))
+        term, year = label.rsplit(' ', 1)
+        year = int(year)
+
+    on_track = None
+    if expected and all(expected):
+        expected_term, expected_year = expected
+        on_track = term is None or (year, CALENDAR_ORDER[term]) <= (expected_year, CALENDAR_ORDER[expected_term])
+    return GraduationEstimate(bounds, term, year, on_track)
 
 """
-Helper function takes a list of semesters, and pairs 
-each one with their associated term and year for display.
+Resolves a student's passed coursework into a set of catalog ids.
+Courses missing from the catalog (transfer credit, electives) are ignored.
+"""
+def completed_courses(user, catalog):
+    codes = UserCourse.objects.filter(user=user, grade__in=PASSING_GRADES).values_list('code', flat=True)
+    return frozenset(catalog.ids(codes))
 
-Returns:
-    (term, semester): Semester contains a list of courses
 """
-def zip_with_terms(semesters):
-    now = datetime.datetime.now()
-    terms = []
+Bulk form of completed_courses for many students in a single query.
 
-    month = now.month + 5
-    year = now.year
+Returns:
+    dict: User pk -> frozenset of catalog ids; students without completed courses are left out
+"""
+def completed_courses_by_user(users, catalog):
+    codes = {}
+    rows = UserCourse.objects.filter(user__in=users, grade__in=PASSING_GRADES).values_list('user_id', 'code')
+    for user_pk, code in rows:
+        codes.setdefault(user_pk, set()).add(code)
+    return {pk: frozenset(catalog.ids(user_codes)) for pk, user_codes in codes.items()}
 
-    if month < 8: # current term is Spring
-        start_year = year
-        terms.append(f"Fall {year}")
-    else: # current term is Fall
-        start_year = year + 1
+"""
+Generates the (label, term bit) sequence of semesters a plan is laid out
+over, alternating Fall and Spring from the next term open for planning.
+The scheduler consumes this same sequence, so each semester is only
+filled with courses offered in the term it is labelled with.
 
-    end_year = start_year + 4
+Yields:
+    (label, term bit): e.g. ("Spring 2027", TERM_BITS["Spring"])
+"""
+def plan_terms(now=None):
+    now = now or datetime.datetime.now()
+    year = now.year
 
-    for year in range(start_year, end_year + 1):
-        terms.append(f"Spring {year}")
-        terms.append(f"Fall {year}")
+    # Fall registration is already underway by March, so planning starts in the following Spring.
+    if now.month + 5 < 8:
+        terms = [Term.FALL, Term.SPRING]
+    else:
+        terms = [Term.SPRING, Term.FALL]
+        year += 1
 
-    result_semesters = []
-    for i, semester in enumerate(semesters):
-        result_semesters += [(terms[i], semester)]
-    print(result_semesters)
-    return result_semesters
+    while True:
+        for term in terms:
+            yield f"{term} {year}", TERM_BITS[term]
+            if term == Term.FALL:
+                year += 1
 
 """
-Given a list of courses, return as a graph of requirements.
-This will include prerequisites not part of the original list.
+Given a list of catalog course ids, return as a graph of requirements.
+This will include prerequisites not part of the original list,
+except those that have already been satisfied.
+
+The courses needed come from one closure lookup per requested course.
+Prerequisites of a satisfied course are only needed if some other
+unsatisfied path leads to them, which the closure can't tell, so those
+few cases fall back to walking the requisite edges.
+Edges are read from the catalog snapshot, so no queries are made here.
 """
-def build_graph(course_list):
+def build_graph(course_list, catalog, satisfied=frozenset()):
+    requested = set(course_list) - satisfied
+    satisfied_mask = to_mask(satisfied)
+
+    needed = to_mask(requested)
+    for course in requested:
+        needed |= catalog.closure[course]
+
+    shadowed = 0
+    for course in iter_ids(needed & satisfied_mask):
+        shadowed |= catalog.closure[course]
+    if needed & shadowed & ~satisfied_mask:
+        needed = reachable_requisites(requested, catalog, satisfied_mask)
+    needed &= ~satisfied_mask
+
     graph = nx.DiGraph()
-    courses = course_list.copy()
-    while courses:
-        selected = courses.pop()
-        graph.add_node(selected.code, credits=selected.credits)
-
-        for prerequisite in selected.prerequisites.all():
-            graph.add_edge(prerequisite.code, selected.code)
-            courses.add(prerequisite)
-        for corequisite in selected.corequisites.all():
-            graph.add_edge(corequisite.code, selected.code)
-            courses.add(corequisite)
+    for selected in iter_ids(needed):
+        code = catalog.codes[selected]
+        graph.add_node(code, credits=catalog.credits[selected], offered=planned_offering(catalog.offered[selected]))
+        for requisite in iter_ids(catalog.requisites[selected] & needed):
+            graph.add_edge(catalog.codes[requisite], code)
 
     return graph
 
+# Bitset of the courses and requisites reachable from `courses` without passing through a satisfied course
+def reachable_requisites(courses, catalog, satisfied_mask):
+    reached = to_mask(courses)
+    pending = list(courses)
+    while pending:
+        found = catalog.requisites[pending.pop()] & ~reached & ~satisfied_mask
+        reached |= found
+        pending.extend(iter_ids(found))
+    return reached
+
+"""
+Restricts a course's offered terms to the planned terms. A course with no
+recorded offering, or none among the planned terms, may go in any term.
+"""
+def planned_offering(offered):
+    return offered & PLANNED_TERMS
+
 """
-Given a list of curriculums, join them as a single set of 
+Given a list of curriculum pks, join them as a single set of
 requirements which must be satisfied.
+Requirements already met by the satisfied courses are left out, and
+CourseGroups across all curriculums are chosen together by the optimizer
+so that courses shared between programs are only taken once.
+
+Returns:
+    set: Catalog ids of the courses that still need to be taken
 """
-def build_requirements(curriculums) -> set:
-    requirements = set()
-    for curriculum in curriculums.all():
-        for requirement in curriculum.requirements.all():
-            requirements |= requirement.get_satisfiable_subset()
-    return requirements
+def build_requirements(curriculums, catalog, satisfied=frozenset(), memo=None) -> set:
+    return optimize_requirements(curriculums, catalog, satisfied, memo=memo)
 
 """
 Generation logic goes here.
 
-Given the graph and a topological sort of the graph,
-return a list of semesters that satisfy all requirements.
-"""
-def generate(graph, topological_courses):
-    semesters = []
-    cur_semester = []
-    cur_semester_credits = 0
-    credit_limit = 16
-    taken_courses = set()
-
-    # Each iteration is one semester being filled
-    while topological_courses:
-        overflow = False
-
-        # Check each course to see if it can be added to the semester
-        for course in topological_courses.copy():
-
-            # Skip if already taken
-            if course in taken_courses:
-                topological_courses.remove(course)
-                continue
-
-            # Check if prerequisites are satisfied, skip if not
-            satisfied = True
-            for prerequisite in list(graph.predecessors(course)):
-                if prerequisite not in taken_courses or prerequisite in cur_semester:
-                    satisfied = False
-                    break
-
-            if not satisfied:
-                continue # Skip
-
-            # Add the course to student plan
-            # If adding the course will surpass credit limit, start a new semester. Otherwise, add it.
-            if cur_semester_credits + graph.nodes[course]['credits'] > credit_limit:
-                overflow = True
-                semesters += [cur_semester]
-                cur_semester = [course]
-                cur_semester_credits = graph.nodes[course]['credits']
-                topological_courses.remove(course)
-                taken_courses.add(course)
-                break
-            else:
-                cur_semester += [course]
-                cur_semester_credits += graph.nodes[course]['credits']
-                topological_courses.remove(course)
-                taken_courses.add(course)
-
-        # Start new semester now that we have exhausted all courses
-        if not overflow:
-            semesters += [cur_semester]
-            cur_semester = []
-            cur_semester_credits = 0
-            
-    return semesters
-
-"""
-Given a graph, generate a base64 raw image representation that may be displayed.
-"""
-def generate_image(graph):
-    graph_layout = nx.spring_layout(graph,  k=3, iterations=500)
-    plt.figure(figsize=(9, 7))
-    nx.draw(graph, graph_layout, with_labels=True, node_color='skyblue', node_size=1200, edge_color='black', linewidths=3, font_size=9)
-
-    buffer = BytesIO()
-    plt.savefig(buffer, format='png')
-    buffer.seek(0)
-
-    image = image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-    plt.close()
-
-    return image
\ No newline at end of file
+Given the graph and the per-semester credit limit,
+return a list of (term, courses) semesters that satisfy all requirements,
+placing each course only in a term it is offered.
+Raises NetworkXUnfeasible if the graph contains a cycle.
+"""
+def generate(graph, credit_limit, terms=None):
+    return schedule(graph, credit_limit, terms or plan_terms())
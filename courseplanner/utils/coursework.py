@@ -0,0 +1,62 @@
+from django.db import transaction
+
+from .plan_cache import invalidate_user_plan
+from ..users.models import UserCourse
+
+"""
+Reconciles a student's coursework with the courses parsed from their
+transcript by (year, semester, code), writing only what changed: one
+bulk_create for new courses, one bulk_update for changed credits or
+grades and one delete for courses gone from the transcript. Unchanged
+rows keep their identity, so re-uploading the same transcript writes
+nothing.
+
+The transcript is authoritative only for the terms it lists. Courses
+entered by hand for other terms, or without a term, are left alone.
+A course taken twice in one term is matched up in order.
+
+Args:
+    courses: (year, semester, code, credits, grade) tuples, see utils.extract_course_info
+
+Returns:
+    (created, updated, deleted): Number of rows written of each kind
+"""
+def sync_user_courses(user, courses):
+    parsed = {}
+    for year, semester, code, credits, grade in courses:
+        parsed.setdefault((year, semester, code), []).append((credits, grade))
+    # Courses listed before any term header have no term, which doesn't make the transcript authoritative for one
+    terms = {(year, semester) for year, semester, _ in parsed} - {(None, None)}
+
+    existing = {}
+    for course in UserCourse.objects.filter(user=user).order_by('pk'):
+        existing.setdefault((course.year, course.semester, course.code), []).append(course)
+
+    created, updated, deleted = [], [], []
+    for key, rows in parsed.items():
+        matches = existing.pop(key, [])
+        for index, (credits, grade) in enumerate(rows):
+            if index >= len(matches):
+                year, semester, code = key
+                created.append(UserCourse(user=user, year=year, semester=semester, code=code,
+                                          credits=credits, grade=grade))
+                continue
+            course = matches[index]
+            if (course.credits, course.grade) != (credits, grade):
+                course.credits, course.grade = credits, grade
+                updated.append(course)
+        deleted.extend(course.pk for course in matches[len(rows):])
+    for (year, semester, _), rows in existing.items():
+        if (year, semester) in terms:
+            deleted.extend(course.pk for course in rows)
+
+    if created or updated or deleted:
+        with transaction.atomic():
+            UserCourse.objects.bulk_create(created)
+            UserCourse.objects.bulk_update(updated, ['credits', 'grade'])
+            UserCourse.objects.filter(pk__in=deleted).delete()
+
+    # Bulk writes send no post_save, so the cached plan is dropped here
+    if created or updated:
+        invalidate_user_plan(user.pk)
+    return len(created), len(updated), len(deleted)
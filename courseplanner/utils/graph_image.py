@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import networkx as nx
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .scheduler import chain_depths
+
+logger = logging.getLogger(__name__)
+
+GRAPH_IMAGE_DIR = 'plans/graphs'
+
+_executor = None
+_executor_lock = threading.Lock()
+
+"""
+Content hash of a planning graph. Identical graphs, from any student,
+share one stored image.
+"""
+def graph_hash(graph):
+    digest = hashlib.sha256()
+    for node in sorted(graph.nodes):
+        digest.update(f"{node}:{graph.nodes[node].get('credits')};".encode())
+    digest.update(b'|')
+    for source, target in sorted(graph.edges):
+        digest.update(f'{source}>{target};'.encode())
+    return digest.hexdigest()
+
+def graph_image_name(digest):
+    return f'{GRAPH_IMAGE_DIR}/{digest}.png'
+
+def graph_data_key(digest):
+    return f'plan-graph:{digest}'
+
+"""
+Deterministic layered layout in O(V + E). Each course is placed in the
+column of its topological depth (the longest prerequisite chain leading
+to it) and stacked within that column in sorted order.
+"""
+def layered_layout(graph):
+    depth = chain_depths(graph, graph.predecessors)
+
+    layers = {}
+    for node in sorted(graph.nodes, key=str):
+        layers.setdefault(depth[node] - 1, []).append(node)
+
+    layout = {}
+    for layer, nodes in layers.items():
+        offset = (len(nodes) - 1) / 2
+        for position, node in enumerate(nodes):
+            layout[node] = (layer, offset - position)
+    return layout
+
+"""
+Renders a graph to PNG bytes. Uses a standalone Agg canvas rather than
+pyplot's global figure state so it is safe to run off the request thread.
+"""
+def render_graph(graph):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(9, 7))
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    nx.draw(graph, layered_layout(graph), ax=axes, with_labels=True, node_color='skyblue', node_size=1200,
+            edge_color='black', linewidths=3, font_size=9)
+
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+def store_graph_image(digest, graph):
+    name = graph_image_name(digest)
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(render_graph(graph)))
+    return name
+
+def _store_graph_image(digest, graph):
+    try:
+        store_graph_image(digest, graph)
+    except Exception:
+        logger.exception("Rendering plan graph %s failed", digest)
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='graph-render')
+        return _executor
+
+"""
+Keeps the graph in the cache under its content hash, so its image can be
+rendered later if someone asks for it, and returns that hash.
+"""
+def remember_graph(graph):
+    digest = graph_hash(graph)
+    cache.set(graph_data_key(digest), nx.node_link_data(graph), getattr(settings, 'PLAN_CACHE_TIMEOUT', None))
+    return digest
+
+"""
+Queues a background render of a remembered graph's image unless it is
+already stored. Returns False if that graph is no longer known.
+"""
+def schedule_graph_image(digest):
+    if default_storage.exists(graph_image_name(digest)):
+        return True
+    data = cache.get(graph_data_key(digest))
+    if data is None:
+        return False
+    get_executor().submit(_store_graph_image, digest, nx.node_link_graph(data))
+    return True
+
+"""
+Compact JSON form of a plan graph for drawing on the client: one row per
+course with its layered layout coordinates and the index of the semester
+it was scheduled in, and edges as pairs of row indexes.
+"""
+def graph_payload(graph, semesters, digest):
+    semester_of = {course: index for index, (_, courses) in enumerate(semesters) for course in courses}
+    layout = layered_layout(graph)
+    nodes = sorted(graph.nodes, key=str)
+    row = {node: index for index, node in enumerate(nodes)}
+    return {
+        'hash': digest,
+        'fields': ['code', 'credits', 'semester', 'x', 'y'],
+        'nodes': [[node, graph.nodes[node]['credits'], semester_of.get(node), *layout[node]] for node in nodes],
+        'edges': sorted([row[source], row[target]] for source, target in graph.edges),
+    }
@@ -0,0 +1,155 @@
+import time
+
+from django.conf import settings
+
+from .bitset import count, mask_credits, to_ids, to_mask
+from .scheduler import chain_depths
+from .solver import (
+    is_satisfied,
+    needed_courses,
+    requirement_credits,
+    satisfiable_subset,
+    solve_group,
+)
+
+# Most child selections considered for a single CourseGroup
+MAX_GROUP_OPTIONS = 32
+
+"""
+Global requirement optimizer across all of a student's curriculums.
+
+Each CourseGroup is solved on its own by the group solver, which cannot
+see that a course picked for a major's elective group also counts for
+a minor. This chooses the members of every unsatisfied group together,
+by branch and bound over each group's candidate selections, to minimize
+the total credits that have to be taken (prerequisites included) and
+then the length of the longest prerequisite chain.
+
+The search starts from the group solver's choices and stops once the
+configured PLANNER_OPTIMIZER_TIME_BUDGET (seconds) runs out, returning
+the best selection found so far, or as soon as a selection reaches the
+lower bound on both objectives, since nothing can beat it. Course sets
+inside the search are bitsets, so each branch costs a few int operations.
+
+Args:
+    memo: Expanded requirements (see needed_courses) to share between calls with the same completed courses
+
+Returns:
+    set: Catalog ids of the courses that still need to be taken
+"""
+def optimize_requirements(curriculum_pks, catalog, completed=frozenset(), time_budget=None, memo=None):
+    if time_budget is None:
+        time_budget = getattr(settings, 'PLANNER_OPTIMIZER_TIME_BUDGET', 0.25)
+    deadline = time.perf_counter() + time_budget
+    completed_mask = to_mask(completed)
+    if memo is None:
+        memo = {}
+
+    fixed = set()
+    groups = []
+    for curriculum in curriculum_pks:
+        for requirement in catalog.curriculums.get(curriculum, ()):
+            if is_satisfied(requirement, catalog, completed):
+                continue
+            if requirement in catalog.groups:
+                if requirement not in groups:
+                    groups.append(requirement)
+            else:
+                fixed |= satisfiable_subset(requirement, catalog, completed)
+    fixed -= completed
+
+    def needed(courses):
+        result = 0
+        for course in courses:
+            result |= needed_courses(course, catalog, completed_mask, memo)
+        return result
+
+    fixed_needed = needed(fixed)
+    options = [group_options(group, catalog, completed, needed) for group in groups]
+
+    # Groups with fewer choices are branched on first so pruning kicks in early
+    order = sorted(range(len(groups)), key=lambda index: len(options[index]))
+
+    def score(taken):
+        return mask_credits(taken, catalog), chain_length(to_ids(taken), catalog)
+
+    incumbent = [solve_group(group, catalog, completed) - completed for group in groups]
+    taken = fixed_needed
+    for courses in incumbent:
+        taken |= needed(courses)
+    best = [score(taken), list(incumbent)]
+
+    # Every group needs at least its cheapest option on top of the fixed courses, and the fixed chain is a floor
+    floor_credits = max((min(mask_credits(needed & ~fixed_needed, catalog) for _, needed in group)
+                         for group in options), default=0)
+    floor = (mask_credits(fixed_needed, catalog) + floor_credits, chain_length(to_ids(fixed_needed), catalog))
+
+    chosen = [None] * len(groups)
+
+    def search(depth, taken, credits):
+        if best[0] <= floor or time.perf_counter() > deadline:
+            return
+        if depth == len(order):
+            candidate = (credits, chain_length(to_ids(taken), catalog))
+            if candidate < best[0]:
+                best[0], best[1] = candidate, list(chosen)
+            return
+        index = order[depth]
+        for courses, courses_needed in options[index]:
+            added = courses_needed & ~taken
+            added_credits = credits + mask_credits(added, catalog)
+            # Credits only grow further down the tree, so a branch already at the best total can't win
+            if added_credits > best[0][0]:
+                continue
+            chosen[index] = courses
+            search(depth + 1, taken | added, added_credits)
+
+    search(0, fixed_needed, mask_credits(fixed_needed, catalog))
+
+    return fixed.union(*best[1])
+
+"""
+Candidate selections of a group's children that meet its minimum credits,
+cheapest first. Each is returned as (courses chosen, bitset of courses needed).
+Only minimal selections are kept: dropping any child would fall short.
+"""
+def group_options(pk, catalog, completed, needed):
+    minimum, children = catalog.groups[pk]
+    items = []
+    for child in children:
+        courses = satisfiable_subset(child, catalog, completed) - completed
+        items.append((count(needed(courses)), child, requirement_credits(child, catalog), courses))
+    items.sort(key=lambda item: (item[0], item[1]))
+
+    remaining = [0] * (len(items) + 1)
+    for index in range(len(items) - 1, -1, -1):
+        remaining[index] = remaining[index + 1] + items[index][2]
+
+    options = []
+
+    def collect(start, credits, selected):
+        if len(options) >= MAX_GROUP_OPTIONS or credits + remaining[start] < minimum:
+            return
+        if credits >= minimum:
+            if credits - min(items[index][2] for index in selected) < minimum:
+                courses = frozenset().union(*(items[index][3] for index in selected))
+                options.append((courses, needed(courses)))
+            return
+        for index in range(start, len(items)):
+            collect(index + 1, credits + items[index][2], selected + (index,))
+
+    collect(0, 0, ())
+    if not options:
+        courses = solve_group(pk, catalog, completed) - completed
+        options.append((courses, needed(courses)))
+
+    options.sort(key=lambda option: (mask_credits(option[1], catalog), sorted(option[0])))
+    return options
+
+"""
+Number of courses on the longest prerequisite chain within the given
+courses, a lower bound on the semesters needed to take them all, see scheduler.chain_depths.
+"""
+def chain_length(courses, catalog):
+    depth = chain_depths(courses, lambda course: catalog.prerequisites[course] + catalog.corequisites[course])
+    return max(depth.values(), default=0)
@@ -0,0 +1,156 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalog import get_catalog
+from .course_util import completed_courses, generate_course_plan, plan_terms
+from .plans import previous_requirements, previous_semesters, store_plan
+from ..users.models import Plan
+
+# Seconds a computation may hold its single-flight lock before another worker may take over
+LOCK_TIMEOUT = 30
+
+# How long a request waits on another worker's computation, and how often it checks for the result
+WAIT_TIMEOUT = 15
+WAIT_INTERVAL = 0.05
+
+"""
+Cache key for a plan. It covers everything a plan depends on, so two
+students with the same curriculums and completed courses share a plan,
+and a catalog change (which bumps the version) misses every old entry.
+The first planned term is included so plans roll over with the calendar.
+"""
+def plan_cache_key(curriculum_pks, completed_pks, credit_limit, catalog_version, first_term):
+    digest = hashlib.sha256()
+    digest.update(','.join(str(pk) for pk in sorted(curriculum_pks)).encode())
+    digest.update(b'|')
+    digest.update(','.join(str(pk) for pk in sorted(completed_pks)).encode())
+    digest.update(b'|')
+    digest.update(first_term.encode())
+    return f'plan:{catalog_version}:{credit_limit}:{digest.hexdigest()}'
+
+def user_plan_key(user_pk):
+    return f'plan:user:{user_pk}'
+
+"""
+Returns the user's plan as (semesters, visualization), computing it only
+when no plan with the same inputs is cached. On a miss, the plan stored
+for the user is re-planned incrementally when it is still compatible,
+and the result is stored again.
+"""
+def get_course_plan(user, credit_limit):
+    catalog = get_catalog()
+    satisfied = completed_courses(user, catalog)
+    curriculums = list(user.curriculums.values_list('pk', flat=True))
+    first_term, _ = next(plan_terms())
+    key = plan_cache_key(curriculums, [catalog.pks[course] for course in satisfied],
+                         credit_limit, catalog.version, first_term)
+
+    def compute():
+        stored = Plan.objects.filter(user=user).first()
+        previous = previous_semesters(stored, catalog, curriculums, credit_limit, first_term)
+        requirements = None if previous is None else previous_requirements(stored, catalog, satisfied)
+        plan = generate_course_plan(curriculums, credit_limit, satisfied, catalog, previous, requirements=requirements)
+        store_plan(user, plan[0], catalog, curriculums, satisfied, credit_limit, first_term)
+        return plan
+
+    plan = single_flight(key, compute, getattr(settings, 'PLAN_CACHE_TIMEOUT', 60 * 60 * 24))
+    cache.set(user_plan_key(user.pk), key, None)
+    return plan
+
+"""
+Single-flight cache fill: of all the requests, in any worker process,
+that miss the same key at once, only the one that wins the lock (a
+cache.add, which is atomic in every shared backend) computes the value.
+The others wait for it to appear in the cache instead of repeating the
+work. A waiter takes over if the lock expires or it has waited too long,
+so a crashed worker cannot stall everyone.
+"""
+def single_flight(key, compute, timeout):
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock = f'{key}:lock'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while not cache.add(lock, token, LOCK_TIMEOUT):
+        # With no holder left either the lock was just released or the cache is unreachable, so don't wait on it
+        if cache.get(lock) is None:
+            break
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if time.monotonic() > deadline:
+            break
+
+    try:
+        # The previous holder may have stored the value just before releasing the lock
+        value = cache.get(key)
+        if value is None:
+            value = compute()
+            cache.set(key, value, timeout)
+        return value
+    finally:
+        if cache.get(lock) == token:
+            cache.delete(lock)
+
+"""
+What-if comparison of several candidate curriculum combinations for one
+student, planned together in a single request. Every candidate shares
+one catalog snapshot, one set of completed courses and one memo of
+expanded requirements, and goes through the same plan cache as the
+student's own plan, so an option tried before (by anyone with the same
+inputs) costs a cache hit and switching to it later is free.
+
+Args:
+    options: Iterable of curriculum pk collections, one per candidate
+
+Returns:
+    [dict]: One summary per distinct candidate, in the order given: its curriculums,
+            number of semesters and courses, total credits and final term
+"""
+def compare_course_plans(user, options, credit_limit):
+    catalog = get_catalog()
+    satisfied = completed_courses(user, catalog)
+    completed_pks = [catalog.pks[course] for course in satisfied]
+    first_term, _ = next(plan_terms())
+
+    keys = {}
+    for option in options:
+        option = tuple(sorted(set(option)))
+        keys.setdefault(option, plan_cache_key(option, completed_pks, credit_limit, catalog.version, first_term))
+
+    plans = cache.get_many(list(keys.values()))
+    missing = {}
+    memo = {}
+    for option, key in keys.items():
+        if key not in plans:
+            plans[key] = missing[key] = generate_course_plan(option, credit_limit, satisfied, catalog, memo=memo)
+    cache.set_many(missing, getattr(settings, 'PLAN_CACHE_TIMEOUT', 60 * 60 * 24))
+
+    return [plan_summary(option, plans[key][0], catalog) for option, key in keys.items()]
+
+def plan_summary(curriculums, semesters, catalog):
+    courses = [code for _, semester in semesters for code in semester]
+    return {
+        'curriculums': list(curriculums),
+        'semesters': len(semesters),
+        'courses': len(courses),
+        'credits': sum(catalog.credits[catalog.index[code]] for code in courses),
+        'graduation': semesters[-1][0] if semesters else None,
+    }
+
+"""
+Drops the plan last served to a user, called when their coursework or
+curriculums change. Catalog changes need no handling here because they
+bump the catalog version that every plan key includes.
+"""
+def invalidate_user_plan(user_pk):
+    key = user_plan_key(user_pk)
+    plan_key = cache.get(key)
+    cache.delete_many([key] if plan_key is None else [key, plan_key])
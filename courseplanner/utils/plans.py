@@ -0,0 +1,65 @@
+from .bitset import to_mask
+from .course_util import plan_terms
+from ..users.models import Plan
+
+"""
+Converts a stored Plan back into [(label, course codes)] semesters for
+incremental re-planning. Returns None when the stored plan was made
+against a different catalog version, credit limit, set of curriculums
+or starting term, since then nothing in it can be reused.
+"""
+def previous_semesters(stored, catalog, curriculums, credit_limit, first_term):
+    if stored is None:
+        return None
+    if (stored.catalog_version != catalog.version or stored.credit_limit != credit_limit
+            or stored.first_term != first_term or stored.curriculums != sorted(curriculums)):
+        return None
+    return [(label, [catalog.codes[catalog.pk_index[pk]] for pk in courses]) for label, courses in stored.semesters]
+
+"""
+Catalog ids of the courses a stored plan still needs, reused as the
+requirement selection so re-planning skips the optimizer. Only valid for
+a plan accepted by previous_semesters, and only when the coursework
+change is that some planned courses were completed, without any of their
+own prerequisites still planned. Returns None otherwise.
+"""
+def previous_requirements(stored, catalog, satisfied):
+    completed = {catalog.pk_index.get(pk) for pk in stored.completed}
+    planned = {catalog.pk_index[pk] for _, courses in stored.semesters for pk in courses}
+    newly_completed = satisfied - completed
+    if not completed <= satisfied or not newly_completed <= planned:
+        return None
+    planned_mask = to_mask(planned)
+    if any(catalog.closure[course] & planned_mask for course in newly_completed):
+        return None
+    return planned - satisfied
+
+"""
+Requirement selection of the user's stored plan, when that plan is still
+valid for these inputs and can be re-planned without the optimizer (see
+previous_semesters and previous_requirements), otherwise None.
+"""
+def stored_requirements(user, catalog, curriculums, satisfied, credit_limit):
+    stored = Plan.objects.filter(user=user).first()
+    first_term, _ = next(plan_terms())
+    if previous_semesters(stored, catalog, curriculums, credit_limit, first_term) is None:
+        return None
+    return previous_requirements(stored, catalog, satisfied)
+
+"""
+Saves a user's plan, storing each semester as an ordered array of Course pks.
+"""
+def store_plan(user, semesters, catalog, curriculums, satisfied, credit_limit, first_term):
+    Plan.objects.update_or_create(user=user, defaults=plan_fields(
+        semesters, catalog, curriculums, satisfied, credit_limit, first_term,
+    ))
+
+def plan_fields(semesters, catalog, curriculums, satisfied, credit_limit, first_term):
+    return {
+        'catalog_version': catalog.version,
+        'credit_limit': credit_limit,
+        'first_term': first_term,
+        'curriculums': sorted(curriculums),
+        'completed': sorted(catalog.pks[course] for course in satisfied),
+        'semesters': [[label, [catalog.pks[catalog.index[code]] for code in courses]] for label, courses in semesters],
+    }
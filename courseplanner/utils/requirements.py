@@ -0,0 +1,74 @@
+from collections import namedtuple
+
+# Leaf of a requirement tree: a single course and its catalog id
+CourseNode = namedtuple('CourseNode', ['pk', 'course', 'code', 'credits'])
+
+# Inner node of a requirement tree: a CourseGroup and its child nodes
+GroupNode = namedtuple('GroupNode', ['pk', 'minimum_credits', 'children'])
+
+"""
+Immutable typed requirement trees materialized from the catalog snapshot.
+
+The catalog already holds every course, CourseGroup membership and
+curriculum requirement from its fixed number of bulk queries, so the
+tree of any requirement is built purely in memory. Each node is built
+once per snapshot and shared by every tree that contains it.
+
+Raises:
+    KeyError: The pk is neither a course nor a CourseGroup in the catalog, such as a bare Requirement
+    ValueError: A CourseGroup contains itself
+"""
+def requirement_tree(pk, catalog):
+    nodes = catalog.requirement_nodes
+    if pk in nodes:
+        return nodes[pk]
+
+    building = set()
+
+    def build(pk):
+        if pk in nodes:
+            return nodes[pk]
+        if pk in catalog.pk_index:
+            course = catalog.pk_index[pk]
+            nodes[pk] = CourseNode(pk, course, catalog.codes[course], catalog.credits[course])
+            return nodes[pk]
+        if pk in building:
+            raise ValueError(f"CourseGroup {pk} contains itself.")
+        building.add(pk)
+        minimum, children = catalog.groups[pk]
+        nodes[pk] = GroupNode(pk, minimum, tuple(build(child) for child in children))
+        building.discard(pk)
+        return nodes[pk]
+
+    return build(pk)
+
+def curriculum_trees(curriculum_pk, catalog):
+    return tuple(requirement_tree(pk, catalog) for pk in catalog.curriculums.get(curriculum_pk, ()))
+
+"""
+Text outline of all of a curriculum's requirements, rendered once per
+catalog snapshot, so it is rebuilt only after the catalog changes.
+"""
+def curriculum_outline(curriculum_pk, catalog):
+    outlines = catalog.curriculum_outlines
+    if curriculum_pk not in outlines:
+        outlines[curriculum_pk] = ''.join(format_requirement(node) for node in curriculum_trees(curriculum_pk, catalog))
+    return outlines[curriculum_pk]
+
+def node_credits(node):
+    if isinstance(node, CourseNode):
+        return node.credits
+    return node.minimum_credits
+
+"""
+Text outline of a requirement tree, one line per node, indented with a
+tab per level of nesting below the root.
+"""
+def format_requirement(node, depth=0):
+    indent = '\t' * depth
+    if isinstance(node, CourseNode):
+        return f'{indent}{node.code}\n'
+    result = f'{indent}CourseGroup ({node.minimum_credits} credits)\n'
+    for child in node.children:
+        result += format_requirement(child, depth + 1)
+    return result
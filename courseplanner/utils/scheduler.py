@@ -0,0 +1,223 @@
+import heapq
+import itertools
+from collections import namedtuple
+
+import networkx as nx
+
+# Offering mask that matches every term
+ANY_TERM = -1
+
+# Number of consecutive empty semesters after which the remaining courses are considered unschedulable
+MAX_IDLE_SEMESTERS = 8
+
+# Lower bounds on the semesters a plan needs: the longest requisite chain, what the credits alone need, and the larger
+PlanBounds = namedtuple('PlanBounds', ['chain', 'credit_semesters', 'semesters'])
+
+"""
+Ready-queue scheduling engine.
+
+Courses become ready once every predecessor has been placed in an
+earlier semester, tracked with an indegree counter per course rather
+than by rescanning the graph. Each semester is filled from the ready
+queue in the order courses became ready (a topological order), and
+courses that do not fit under the credit limit, or are not offered in
+that semester's term, wait for a later one.
+
+Args:
+    graph: DiGraph whose nodes carry `credits` and optionally an `offered` term bitmask
+    credit_limit: A semester must not surpass this limit
+    terms: Iterable of (label, term bit) pairs, one per semester. Defaults to
+           numbered semesters without any offering restrictions.
+
+Returns:
+    [(label, courses)]: One entry per semester, labelled from `terms`
+
+Runs in O((V + E) log V) plus the courses deferred for lack of room.
+"""
+def schedule(graph, credit_limit, terms=None):
+    if terms is None:
+        terms = ((number, ANY_TERM) for number in itertools.count(1))
+    terms = iter(terms)
+
+    indegree = {}
+    ready = []
+    sequence = 0
+
+    for course, degree in graph.in_degree():
+        indegree[course] = degree
+        if degree == 0:
+            ready.append((sequence, course))
+            sequence += 1
+
+    credits = nx.get_node_attributes(graph, 'credits')
+    offered = {course: graph.nodes[course].get('offered') or ANY_TERM for course in graph}
+    smallest = min(credits.values(), default=0)
+    semesters = []
+    placed = 0
+    idle = 0
+
+    while ready:
+        label, term = next(terms)
+        semester = []
+        semester_credits = 0
+        deferred = []
+
+        # Fill the semester in ready order, deferring anything that overflows it or isn't offered.
+        # An empty semester always takes the next course so oversized courses still get placed.
+        while ready and (not semester or credit_limit - semester_credits >= smallest):
+            item = heapq.heappop(ready)
+            course_credits = credits[item[1]]
+            if not offered[item[1]] & term or (semester and semester_credits + course_credits > credit_limit):
+                deferred.append(item)
+                continue
+            semester.append(item[1])
+            semester_credits += course_credits
+
+        for item in deferred:
+            heapq.heappush(ready, item)
+
+        # Successors unlocked by this semester only become available in the next one.
+        for course in semester:
+            for successor in graph.successors(course):
+                indegree[successor] -= 1
+                if indegree[successor] == 0:
+                    heapq.heappush(ready, (sequence, successor))
+                    sequence += 1
+
+        semesters.append((label, semester))
+        placed += len(semester)
+
+        idle = 0 if semester else idle + 1
+        if idle > MAX_IDLE_SEMESTERS:
+            raise ValueError("Remaining courses are not offered in any of the planned terms.")
+
+    if placed != len(indegree):
+        raise nx.NetworkXUnfeasible("Graph contains a cycle; the remaining courses can never be scheduled.")
+
+    return semesters
+
+"""
+Incremental re-planning after the set of courses to take has changed.
+
+Courses no longer in the graph, because they were completed or are no
+longer needed, are taken out of the previous plan's semesters. Those
+semesters are then kept up to the first one that is no longer valid: it
+was emptied that way, or holds a course whose prerequisites aren't all
+placed in earlier kept semesters. Courses new to the plan also cap the
+kept prefix at the semester right after their latest already-placed
+prerequisite. Only the semesters from there on are scheduled again, so
+a small coursework edit re-plans a small suffix.
+
+Args:
+    graph: The new planning graph
+    previous: [(label, courses)] semesters of the previous plan over the same terms
+    credit_limit: A semester must not surpass this limit
+    terms: The full term sequence the previous plan was laid out over
+
+Returns:
+    [(label, courses)]: The kept semesters followed by the re-planned ones
+"""
+def reschedule(graph, previous, credit_limit, terms=None):
+    remaining = []
+    for semester in previous:
+        label, courses = semester
+        kept = [course for course in courses if course in graph]
+        remaining.append(semester if len(kept) == len(courses) else (label, kept))
+    previous = remaining
+    placed = {course: index for index, (_, courses) in enumerate(previous) for course in courses}
+    first = first_invalid_semester(graph, previous, placed)
+
+    # A new course whose prerequisites are all in the old plan fits no earlier than right after them.
+    # New courses that depend on other new courses are bounded by those.
+    for course in graph:
+        if course in placed:
+            continue
+        requisites = list(graph.predecessors(course))
+        if all(requisite in placed for requisite in requisites):
+            first = min(first, 1 + max((placed[requisite] for requisite in requisites), default=-1))
+
+    kept = previous[:first]
+    taken = {course for _, courses in kept for course in courses}
+    # Copied rather than viewed through subgraph(), whose node order would follow a set
+    remaining = graph.copy()
+    remaining.remove_nodes_from(taken)
+
+    if terms is None:
+        terms = ((number, ANY_TERM) for number in itertools.count(1))
+    return kept + schedule(remaining, credit_limit, itertools.islice(terms, first, None))
+
+def first_invalid_semester(graph, previous, placed):
+    for index, (_, courses) in enumerate(previous):
+        if not courses:
+            return index
+        for course in courses:
+            if any(placed.get(requisite, index) >= index for requisite in graph.predecessors(course)):
+                return index
+    return len(previous)
+
+"""
+Lower bounds on the number of semesters any schedule of the graph needs,
+in O(V + E) and without scheduling it.
+
+Every edge forces its courses into different semesters, so the longest
+requisite chain (the critical path, counted in courses) is one bound.
+The credits are another: a course over the credit limit takes a semester
+of its own and the rest pack into at most `credit_limit` per semester.
+Offerings are ignored, so real plans may need more.
+
+Raises:
+    NetworkXUnfeasible: The graph contains a cycle
+"""
+def plan_bounds(graph, credit_limit):
+    depth = chain_depths(graph, graph.predecessors)
+
+    oversized = 0
+    credits = 0
+    for _, course_credits in graph.nodes(data='credits'):
+        if course_credits > credit_limit:
+            oversized += 1
+        else:
+            credits += course_credits
+    credit_semesters = oversized + -(-credits // credit_limit)
+
+    chain = max(depth.values(), default=0)
+    return PlanBounds(chain, credit_semesters, max(chain, credit_semesters))
+
+"""
+Length of the longest requisite chain ending at each course, counted in
+courses, in O(V + E). This is the one critical-path walk shared by
+plan_bounds, the requirement optimizer and the graph layout.
+
+Args:
+    courses: Iterable of courses
+    requisites: Function returning a course's direct requisites; any outside `courses` are ignored
+
+Returns:
+    dict: Course -> chain length, 1 for a course without requisites
+
+Raises:
+    NetworkXUnfeasible: The courses' requisites contain a cycle
+"""
+def chain_depths(courses, requisites):
+    depth = {course: 1 for course in courses}
+    indegree = dict.fromkeys(depth, 0)
+    dependents = {course: [] for course in depth}
+    for course in depth:
+        for requisite in requisites(course):
+            if requisite in depth:
+                indegree[course] += 1
+                dependents[requisite].append(course)
+
+    ready = [course for course, degree in indegree.items() if degree == 0]
+    visited = 0
+    while ready:
+        course = ready.pop()
+        visited += 1
+        for dependent in dependents[course]:
+            depth[dependent] = max(depth[dependent], depth[course] + 1)
+            indegree[dependent] -= 1
+            if indegree[dependent] == 0:
+                ready.append(dependent)
+    if visited != len(depth):
+        raise nx.NetworkXUnfeasible("Graph contains a cycle; the remaining courses can never be scheduled.")
+    return depth
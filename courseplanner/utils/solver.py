@@ -0,0 +1,125 @@
+import logging
+
+from .bitset import count, iter_ids, to_mask
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on memoized group solutions kept per catalog version
+MAX_SOLUTIONS = 4096
+
+_solutions = {}
+_solutions_version = None
+
+"""
+Requirement helpers that walk the catalog snapshot by requirement pk.
+A requirement pk is either a course (in catalog.pk_index) or a
+CourseGroup (in catalog.groups).
+"""
+def requirement_credits(pk, catalog):
+    if pk in catalog.pk_index:
+        return catalog.credits[catalog.pk_index[pk]]
+    return catalog.groups[pk][0]
+
+"""
+Whether a requirement is met by the completed courses. A CourseGroup is
+met once its satisfied requirements add up to its minimum credits.
+"""
+def is_satisfied(pk, catalog, completed):
+    if pk in catalog.pk_index:
+        return catalog.pk_index[pk] in completed
+    minimum, children = catalog.groups[pk]
+    credits = sum(requirement_credits(child, catalog) for child in children if is_satisfied(child, catalog, completed))
+    return credits >= minimum
+
+"""
+Returns the catalog ids of the courses chosen to satisfy a requirement.
+Completed courses are included, callers drop them when planning.
+"""
+def satisfiable_subset(pk, catalog, completed=frozenset()):
+    if pk in catalog.pk_index:
+        return frozenset([catalog.pk_index[pk]])
+    return solve_group(pk, catalog, completed)
+
+"""
+Courses that would have to be taken for a course to be taken: the course
+itself and its transitive prerequisites and corequisites, less anything
+already completed. The walk stops at completed courses, whose own
+prerequisites are no longer needed.
+
+Args:
+    completed: Bitset of completed catalog ids, see utils.bitset
+    memo: Dict of results shared by calls with the same completed bitset
+
+Returns:
+    int: Bitset of the needed catalog ids
+"""
+def needed_courses(course, catalog, completed, memo):
+    if course in memo:
+        return memo[course]
+
+    needed = 0
+    frontier = (1 << course) & ~completed
+    while frontier:
+        needed |= frontier
+        reached = 0
+        for selected in iter_ids(frontier):
+            reached |= catalog.requisites[selected]
+        frontier = reached & ~needed & ~completed
+
+    memo[course] = needed
+    return needed
+
+"""
+Deterministic CourseGroup solver.
+
+Picks the child requirements that meet the group's minimum credits while
+needing the fewest courses to be taken, counting each child's transitive
+prerequisites. Completed courses cost nothing, so they are preferred.
+Solved as a 0/1 knapsack over credits, ties broken by fewer credits and
+then by requirement pk, so the same inputs always give the same plan.
+
+Results are memoized per (group, catalog version, completed set).
+"""
+def solve_group(pk, catalog, completed=frozenset()):
+    global _solutions, _solutions_version
+    if _solutions_version != catalog.version or len(_solutions) > MAX_SOLUTIONS:
+        _solutions = {}
+        _solutions_version = catalog.version
+
+    key = (pk, completed)
+    if key not in _solutions:
+        _solutions[key] = _solve_group(pk, catalog, completed)
+    return _solutions[key]
+
+def _solve_group(pk, catalog, completed):
+    minimum, children = catalog.groups[pk]
+    completed_mask = to_mask(completed)
+    memo = {}
+
+    options = []
+    for child in children:
+        courses = satisfiable_subset(child, catalog, completed)
+        needed = 0
+        for course in courses:
+            needed |= needed_courses(course, catalog, completed_mask, memo)
+        options.append((child, requirement_credits(child, catalog), courses, count(needed)))
+
+    if sum(credits for _, credits, _, _ in options) < minimum:
+        logger.warning("CourseGroup %s cannot meet its %s credit minimum; planning all of it.", pk, minimum)
+        return frozenset().union(*(courses for _, _, courses, _ in options))
+
+    # best[c] holds the cheapest (cost, credits, pks) selection reaching c credits, capped at the minimum
+    best = [None] * (minimum + 1)
+    best[0] = (0, 0, ())
+    for child, credits, _, cost in options:
+        for reached in range(minimum, -1, -1):
+            if best[reached] is None:
+                continue
+            selected_cost, selected_credits, selected = best[reached]
+            target = min(minimum, reached + credits)
+            candidate = (selected_cost + cost, selected_credits + credits, selected + (child,))
+            if best[target] is None or candidate < best[target]:
+                best[target] = candidate
+
+    chosen = set(best[minimum][2])
+    return frozenset().union(*(courses for child, _, courses, _ in options if child in chosen))
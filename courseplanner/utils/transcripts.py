@@ -0,0 +1,101 @@
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .utils import TRANSCRIPT_PARSER_VERSION, extract_course_info
+
+TRANSCRIPT_INDEX_KEY = f'transcript:v{TRANSCRIPT_PARSER_VERSION}:index'
+
+# Seconds the index lock is held at most, and waited for before giving up on updating the index
+INDEX_LOCK_TIMEOUT = 5
+INDEX_WAIT_TIMEOUT = 1
+INDEX_WAIT_INTERVAL = 0.01
+
+"""
+Upload handler that computes each uploaded file's SHA-256 from the
+chunks as they stream in and passes the chunks on unchanged to the
+handlers after it, which build the file as usual. The digests end up in
+`request.upload_digests`, keyed by form field name.
+"""
+class HashingUploadHandler(FileUploadHandler):
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, 'upload_digests'):
+            self.request.upload_digests = {}
+        self.request.upload_digests[self.field_name] = self.digest.hexdigest()
+        return None
+
+def file_digest(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+def transcript_key(digest):
+    return f'transcript:v{TRANSCRIPT_PARSER_VERSION}:{digest}'
+
+"""
+Parsed courses of a transcript, cached by the SHA-256 of its content, so
+uploading the same PDF again never opens it. The parser version is part
+of the key, so a parser change misses every older entry.
+
+Args:
+    digest: The file's SHA-256 if already known, see HashingUploadHandler
+
+Returns:
+    list: (year, term, code, credits, grade) tuples, see extract_course_info
+"""
+def get_course_info(file, digest=None):
+    key = transcript_key(digest or file_digest(file))
+    courses = cache.get(key)
+    if courses is None:
+        courses = extract_course_info(file)
+        remember_transcript(key, courses)
+    return courses
+
+"""
+Stores newly parsed courses and appends them to an index of cached
+transcripts. Once the index outgrows TRANSCRIPT_CACHE_MAX_ENTRIES, the
+oldest transcripts are deleted, which bounds the cache whatever the
+backend's own eviction policy is.
+
+Concurrent uploads update the index under a cache.add lock so they don't
+drop each other's entries. If the lock can't be had in time the index
+update is skipped, and the entry still expires after
+TRANSCRIPT_CACHE_TIMEOUT.
+"""
+def remember_transcript(key, courses):
+    limit = getattr(settings, 'TRANSCRIPT_CACHE_MAX_ENTRIES', 1000)
+    cache.set(key, courses, getattr(settings, 'TRANSCRIPT_CACHE_TIMEOUT', 60 * 60 * 24 * 30))
+
+    lock = f'{TRANSCRIPT_INDEX_KEY}:lock'
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + INDEX_WAIT_TIMEOUT
+    while not cache.add(lock, token, INDEX_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return
+        time.sleep(INDEX_WAIT_INTERVAL)
+
+    try:
+        index = [entry for entry in cache.get(TRANSCRIPT_INDEX_KEY, []) if entry != key]
+        index.append(key)
+        evicted, index = index[:-limit], index[-limit:]
+        cache.set(TRANSCRIPT_INDEX_KEY, index, None)
+        if evicted:
+            cache.delete_many(evicted)
+    finally:
+        if cache.get(lock) == token:
+            cache.delete(lock)
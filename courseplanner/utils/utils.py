@@ -1,61 +1,137 @@
+from django.conf import settings
 from django.utils import timezone
 import PyPDF2
+import io
+import multiprocessing
 import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
 def get_graduation_years():
     current_year = timezone.now().year
     return [(year, str(year)) for year in range(current_year, current_year + 8)]
 
 
-# Returns a list of (code, credits, grade) tuples from the provided transcript.
-def extract_course_info(file):
+# Bump whenever parsing changes so transcripts cached by an older parser are parsed again
+TRANSCRIPT_PARSER_VERSION = 2
+
+# One pass over each page's text: every line is classified by a single match at its start as a term header,
+# a course listing "{course code} {course name} {attempted credits} {earned credits} {grade} {gpa points}",
+# or the end of the transcript. Other lines never match.
+TRANSCRIPT_PATTERN = re.compile(
+    r'^(?:(?P<term>Spring|Summer|Fall|Winter) (?:Semester|Session) (?P<year>\d{4})'
+    r'|(?P<code>[A-Z]{2,5}\s(?:\d{3}|O{3})).*'
+    r'|(?P<end>End of (?:\w+ )*Transcript))',
+    re.MULTILINE,
+)
+CREDITS_PATTERN = re.compile(r'(\d{1,2})\.\d{2,3}')  # First number on a course line is the attempted credit hours
+GRADE_PATTERN = re.compile(r'(?<=\b\d\.\d\d)[A-Z\-+]*(?=\d+\.\d+\b)')  # Grade sits between two numbers
 
-    # Parses course info from transcript line of following format: 
-    # "{course code} {course name} {attempted credits} {earned credits} {grade} {gpa points}"
-    def parse_course(line, semester, year):
-        if re.match(class_pattern, line):
+# Yields (year, term, code, credits, grade) for each course on the transcript, stopping at the end of the course
+# listings. Short transcripts are read one page at a time so memory stays flat; long ones are extracted in parallel,
+# see parallel_page_entries. Pages are parsed on their own and the term carries over from page to page here.
+def iter_course_info(file):
+    reader = PyPDF2.PdfReader(file)
+    pages = None
+    if len(reader.pages) >= getattr(settings, 'TRANSCRIPT_PARALLEL_MIN_PAGES', 16):
+        pages = parallel_page_entries(file, len(reader.pages))
+    if pages is None:
+        pages = (page_entries(page.extract_text(space_width=2)) for page in reader.pages)
 
-            course_num = re.search(course_num_pattern, line).group()
-            grade_info = re.findall(grade_info_pattern, line)
-            grade = re.search(grade_pattern, line)
+    semester = None
+    year = None
+    try:
+        for entries in pages:
+            for entry in entries:
+                if entry is None:
+                    return
+                if len(entry) == 2:
+                    semester, year = entry
+                else:
+                    yield (year, semester) + entry
+    finally:
+        pages.close()
 
-            if grade:
-                grade = grade.group()
+# Parses one page's text without any context from earlier pages. Returns its entries in order: (term, year) for a
+# term header, (code, credits, grade) for a course and None for the end of the transcript.
+def page_entries(text):
+    entries = []
+    for match in TRANSCRIPT_PATTERN.finditer(text):
+        if match.lastgroup == 'year':
+            entries.append((match.group('term'), int(match.group('year'))))
+        elif match.lastgroup == 'end':
+            entries.append(None)
+            break
+        else:
+            line = match.group()
+            credits = CREDITS_PATTERN.search(line)
+            if credits is None:
+                continue
+            # An in-progress course has no grade, which the pattern reports as an empty match
+            grade = GRADE_PATTERN.search(line)
+            grade = grade.group() if grade else None
+            entries.append((match.group('code'), int(credits.group(1)), grade or None))
+    return entries
 
-            return year, semester, course_num, int(grade_info[0][0]), grade
+# Text extraction is CPU-bound, so long transcripts are split into contiguous runs of pages, two per worker process.
+# Returns a generator of page_entries lists in page order, or None to extract serially instead. Runs not yet started
+# are cancelled once the generator is closed, which iter_course_info does when it reaches the end of the transcript.
+def parallel_page_entries(file, page_count):
+    workers = min(getattr(settings, 'TRANSCRIPT_WORKERS', 1), page_count)
+    if workers <= 1:
+        return None
+    file.seek(0)
+    data = file.read()
+    size = -(-page_count // (workers * 2))
+    try:
+        runs = [get_transcript_pool(workers).submit(_extract_pages, data, start, min(start + size, page_count))
+                for start in range(0, page_count, size)]
+    except (BrokenProcessPool, OSError, RuntimeError):
+        shutdown_transcript_pool()
         return None
+    return _merge_runs(runs)
 
-    # Open file in PyPDF2
-    reader = PyPDF2.PdfReader(file)
-    classes = []
-
-    class_pattern = re.compile(r'[A-Z]{2,5}\s(\d{3}|O{3}).*') # Determine if line is a course listing or some other transcript line
-    course_num_pattern = re.compile(r'[A-Z]{2,5}\s(\d{3}|O{3})') # Match courses numbers
-    grade_info_pattern = re.compile(r'\d{1,2}\.\d{2,3}') # Match credit hours
-    grade_pattern = re.compile(r'(?<=\b\d\.\d\d)[A-Z\-+]*(?=\d+\.\d+\b)') # Match grade
-    semester_pattern = re.compile(r'(Spring|Summer|Fall|Winter) (Semester|Session) (\d{4})') # Match semester and year
-
-    curr_semester = None
-    curr_year = None
-    
-    # Iterate through each page of the PDF
-    for page_num in range(len(reader.pages)):
-
-        # Extract text from the page
-        page_text = reader.pages[page_num].extract_text(space_width=2)
-        lines = page_text.split('\n')
-
-        # Iterate through each line
-        for line in lines:
-            # Check for semester information
-            semester_match = re.match(semester_pattern, line)
-            if semester_match:
-                curr_semester, _, curr_year = semester_match.groups()
-                continue
+def _merge_runs(runs):
+    try:
+        for run in runs:
+            yield from run.result()
+    finally:
+        for run in runs:
+            run.cancel()
+
+def _extract_pages(data, start, stop):
+    pages = PyPDF2.PdfReader(io.BytesIO(data)).pages
+    entries = []
+    for number in range(start, stop):
+        entries.append(page_entries(pages[number].extract_text(space_width=2)))
+        if None in entries[-1]:
+            break
+    return entries
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
 
-            # Parse course information
-            result = parse_course(line, curr_semester, curr_year)
-            if result:
-                classes += [result]
-        
-    return classes
+# Long-lived pool of spawned, not forked, workers: the web process may already run threads (see graph_image) whose
+# locks a forked child would inherit held. It is started on first use and kept for the life of the process.
+def get_transcript_pool(workers):
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+def shutdown_transcript_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+# Returns a list of (year, term, code, credits, grade) tuples from the provided transcript.
+def extract_course_info(file):
+    return list(iter_course_info(file))